@@ -0,0 +1,117 @@
+"""Token authentication with cached token lookups.
+
+Users are kept by token for ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds in a
+per-process LRU and, with the ``AUTH_TOKEN_SHARED_CACHE`` setting, in
+the shared cache. Entries remember the user's auth version (see
+``api.versions``), which moves on logout and when ``User.save()`` or
+``User.objects.update()`` change the password, active or staff flags,
+so that stale entries are dropped at once; other processes only see the
+move with a shared cache backend. Versions are read before the database
+lookup whose result they guard. Other field changes made with
+``update()`` show up once entries expire.
+
+Only field values are cached, never the password hash, which stays
+deferred; every request gets its own user instance.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+
+from api import versions
+from foodgram.constants import (AUTH_TOKEN_CACHE_KEY_PREFIX,
+                                AUTH_TOKEN_CACHE_SIZE,
+                                AUTH_TOKEN_CACHE_TIMEOUT)
+
+UNCACHED_FIELDS = {"password"}
+
+
+def get_cache_key(key):
+    """Tokens are secrets, keep only their hash in cache keys."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"{AUTH_TOKEN_CACHE_KEY_PREFIX}:{digest}"
+
+
+def get_auth_version(user_id):
+    return versions.get_versions(versions.get_auth_name(user_id))[0]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in TokenAuthentication caching token -> user."""
+
+    # Cache key: (expires, {attname: value}, version).
+    entries = OrderedDict()
+    lock = threading.Lock()
+
+    def authenticate_credentials(self, key):
+        cache_key = get_cache_key(key)
+        entry = self.get_entry(cache_key)
+        if entry is not None:
+            user = self.get_user(entry[0])
+            if entry[1] == get_auth_version(user.pk):
+                return user, self.get_model()(key=key, user=user)
+
+        # The version is read before the user: a logout or deactivation
+        # committing in between moves it, and the entry is never used.
+        user_id = (
+            self.get_model()
+            .objects.filter(key=key)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        version = None if user_id is None else get_auth_version(user_id)
+        user, token = super().authenticate_credentials(key)
+        self.set_entry(
+            cache_key,
+            (
+                {
+                    field.attname: getattr(user, field.attname)
+                    for field in user._meta.concrete_fields
+                    if field.name not in UNCACHED_FIELDS
+                },
+                version,
+            ),
+        )
+
+        return user, token
+
+    def get_user(self, values):
+        user_model = get_user_model()
+        return user_model.from_db(
+            router.db_for_read(user_model), list(values), list(values.values())
+        )
+
+    def get_entry(self, cache_key):
+        with self.lock:
+            expires, *entry = self.entries.pop(cache_key, (0, None, None))
+            if expires > time.monotonic():
+                self.entries[cache_key] = (expires, *entry)
+                return entry
+
+        if getattr(settings, "AUTH_TOKEN_SHARED_CACHE", False):
+            entry = cache.get(cache_key)
+            if entry is not None:
+                self.set_local_entry(cache_key, entry)
+                return entry
+
+        return None
+
+    def set_entry(self, cache_key, entry):
+        self.set_local_entry(cache_key, entry)
+        if getattr(settings, "AUTH_TOKEN_SHARED_CACHE", False):
+            cache.set(cache_key, entry, timeout=AUTH_TOKEN_CACHE_TIMEOUT)
+
+    def set_local_entry(self, cache_key, entry):
+        with self.lock:
+            self.entries[cache_key] = (
+                time.monotonic() + AUTH_TOKEN_CACHE_TIMEOUT,
+                *entry,
+            )
+            while len(self.entries) > AUTH_TOKEN_CACHE_SIZE:
+                self.entries.popitem(last=False)
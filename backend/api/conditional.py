@@ -0,0 +1,70 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from api import versions
+
+VIEWER = object()
+
+
+def conditional_get(*version_names, timestamp=None):
+    """Answer GET requests with 304 Not Modified when nothing changed.
+
+    Validators are built from change versions and an optional
+    ``timestamp(view, request, *args, **kwargs)`` of the object, without
+    serializing the response. ``VIEWER`` stands for the request user's
+    own version. A missing timestamp means the object does not exist,
+    the view then runs as usual.
+
+    Last-Modified has whole seconds: it is only sent and checked once its
+    second is over, so that a change later in the same second cannot
+    hide behind it. Until then clients revalidate with the ETag.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            names = [
+                versions.get_viewer_name(request.user.pk)
+                if name is VIEWER else name
+                for name in version_names
+            ]
+            stamps = [
+                stamp / 10 ** 9 for stamp in versions.get_versions(*names)
+            ]
+            if timestamp is not None:
+                object_timestamp = timestamp(self, request, *args, **kwargs)
+                if object_timestamp is None:
+                    return method(self, request, *args, **kwargs)
+                stamps.append(object_timestamp.timestamp())
+
+            etag = quote_etag(
+                hashlib.md5(
+                    f"{request.get_full_path()}:{names}:{stamps}".encode()
+                ).hexdigest()
+            )
+            last_modified = int(max(stamps))
+            if time.time() < last_modified + 1:
+                # The second is not over, it may still get another change.
+                last_modified = None
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    response.headers["ETag"] = etag
+                    if last_modified is not None:
+                        response.headers["Last-Modified"] = http_date(
+                            last_modified
+                        )
+
+            return response
+
+        return wrapper
+
+    return decorator
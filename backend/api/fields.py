@@ -1,14 +1,51 @@
 import base64
 
 from django.core.files.base import ContentFile
+from PIL import Image
 from rest_framework import serializers
 
+from foodgram import images
+from foodgram.constants import IMAGE_UPLOAD_FORMATS
+
 
 class Bit64ImageField(serializers.ImageField):
+    """Base64 image, checked by its header only.
+
+    Full decoding is left to the variants job of foodgram.images, which
+    marks undecodable images as failed.
+    """
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
             format, imgstr = data.split(";base64,")
             ext = format.split("/")[-1]
             data = ContentFile(base64.b64decode(imgstr), name="photo." + ext)
 
-        return super().to_internal_value(data)
+        file = serializers.FileField.to_internal_value(self, data)
+        try:
+            # Image.open reads the header only, the pixels stay undecoded.
+            with Image.open(file) as image:
+                if image.format not in IMAGE_UPLOAD_FORMATS:
+                    self.fail("invalid_image")
+        except (OSError, Image.DecompressionBombError):
+            self.fail("invalid_image")
+        finally:
+            file.seek(0)
+
+        return file
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Absolute URLs of image variants, see foodgram.images."""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        return {
+            size: {
+                extension: (
+                    request.build_absolute_uri(url) if request else url
+                )
+                for extension, url in urls.items()
+            }
+            for size, urls in images.get_urls(value).items()
+        }
@@ -1,8 +1,55 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 from foodgram.constants import MAIN_PAGE_RECORDS_LIMIT
 
 
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over (created, id), no OFFSET and no COUNT(*)."""
+
+    page_size_query_param = "limit"
+    page_size = MAIN_PAGE_RECORDS_LIMIT
+    ordering = ("-created", "-id")
+
+
+class FeedCursorPagination(RecipeCursorPagination):
+    """Keyset pagination over feed rows, see recipes.feed."""
+
+    ordering = ("-created", "-recipe_id")
+
+
 class MainPagePagination(PageNumberPagination):
+    """Page number pagination, switched to cursor mode on request.
+
+    Cursor mode is enabled with ``?pagination=cursor``; the ``next`` and
+    ``previous`` links it returns carry the ``cursor`` parameter.
+    """
+
     page_size_query_param = "limit"
     page_size = MAIN_PAGE_RECORDS_LIMIT
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_pagination_class = RecipeCursorPagination
+
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
@@ -0,0 +1,18 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Newline delimited JSON, read lazily as an iterator of text lines.
+
+    Lines are parsed by the view, which can then report errors per line.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return codecs.iterdecode(stream, encoding)
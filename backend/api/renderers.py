@@ -0,0 +1,48 @@
+import json
+
+from django.http import Http404
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+
+class FileRenderer(BaseRenderer):
+    """Marks a downloadable format; file bodies are streamed by the view.
+
+    Only error responses go through ``render``.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class PlainTextRenderer(FileRenderer):
+    media_type = "text/plain"
+    format = "txt"
+
+
+class CSVRenderer(FileRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class PDFRenderer(FileRenderer):
+    media_type = "application/pdf"
+    format = "pdf"
+    charset = None
+
+
+class FormatNegotiation(BaseContentNegotiation):
+    """Pick the renderer by ``?format=`` only, ignoring Accept."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        format = format_suffix or request.query_params.get("format")
+        for renderer in renderers:
+            if format in (None, renderer.format):
+                return renderer, renderer.media_type
+
+        raise Http404
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
@@ -1,7 +1,7 @@
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
-from api.fields import Bit64ImageField
+from api.fields import Bit64ImageField, ImageVariantsField
 from users.models import User
 
 
@@ -10,6 +10,7 @@ class UserProfileSerializer(UserCreateSerializer):
 
     is_subscribed = serializers.SerializerMethodField()
     avatar = Bit64ImageField(use_url=True)
+    avatar_variants = ImageVariantsField()
 
     class Meta:
         model = User
@@ -21,18 +22,29 @@ class UserProfileSerializer(UserCreateSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get("request").user
+        request = self.context.get("request")
 
         return (
-            user.is_authenticated
-            and user.subscriptions_where_subscriber.filter(
-                author=obj.id
-            ).exists()
+            request is not None
+            and request.user.is_authenticated
+            and obj.id in self.get_subscribed_author_ids(request)
         )
 
+    @staticmethod
+    def get_subscribed_author_ids(request):
+        """Load ids of the authors followed by the user once per request."""
+        if not hasattr(request, "_subscribed_author_ids"):
+            request._subscribed_author_ids = set(
+                request.user.subscriptions_where_subscriber.order_by()
+                .values_list("author_id", flat=True)
+            )
+
+        return request._subscribed_author_ids
+
 
 class CreateUserProfileSerializer(UserProfileSerializer):
     """Serialize user model for creating."""
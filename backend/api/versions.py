@@ -0,0 +1,79 @@
+"""Change versions of tables and per-user data, kept in the cache.
+
+A version is the time in nanoseconds of the last committed change, so
+it also serves as a Last-Modified value.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "change-version"
+
+RECIPES = "recipes"
+INGREDIENTS = "ingredients"
+USERS = "users"
+RECIPE_INGREDIENTS = "recipe-ingredients"
+FAVORITES = "favorites"  # Favorite counts of recipes.
+
+
+def get_viewer_name(user_id):
+    """Version of the data only visible to the user (flags, follows)."""
+    return f"viewer:{user_id or 'anonymous'}"
+
+
+def get_cart_name(user_id):
+    return f"cart:{user_id}"
+
+
+def get_auth_name(user_id):
+    """Version of the user's tokens, password and active flag."""
+    return f"auth:{user_id}"
+
+
+def get_key(name):
+    return f"{KEY_PREFIX}:{name}"
+
+
+def get_versions(*names):
+    keys = [get_key(name) for name in names]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def touch(name):
+    """Move a version forward right away and return the new value."""
+    version = time.time_ns()
+    cache.set(get_key(name), version, timeout=None)
+
+    return version
+
+
+def increment(name):
+    """Move a version forward atomically and return the new value.
+
+    Concurrent calls never return the same value, so getting the version
+    read before plus one means nobody else moved it in between. The
+    value then no longer is a time, only use it for such versions.
+    """
+    key = get_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.incr(key)
+
+
+def bump(*names):
+    """Move versions forward once the current transaction commits."""
+    transaction.on_commit(
+        lambda: cache.set_many(
+            {get_key(name): time.time_ns() for name in names}, timeout=None
+        )
+    )
@@ -1,3 +1,4 @@
+from django.db import transaction
 from djoser.views import UserViewSet
 from rest_framework import status
 from rest_framework.decorators import action
@@ -6,6 +7,8 @@ from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 
+from api import versions
+from api.conditional import VIEWER, conditional_get
 from api.serializers import UserProfileAvatarSerializer, UserProfileSerializer
 from users.models import Subscription, User
 from users.serializers import (CreateSubscriptionSerializer,
@@ -18,6 +21,14 @@ class UserProfileViewSet(UserViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,)
     pagination_class = LimitOffsetPagination
 
+    @conditional_get(versions.USERS, VIEWER)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(versions.USERS, VIEWER)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(
         detail=False,
         methods=("get",),
@@ -43,6 +54,7 @@ class UserProfileViewSet(UserViewSet):
             return self.create_avatar(request)
         return self.delete_avatar(request)
 
+    @transaction.atomic
     def create_avatar(self, request):
         serializer = UserProfileAvatarSerializer(
             request.user, data=request.data, partial=True
@@ -53,10 +65,12 @@ class UserProfileViewSet(UserViewSet):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @transaction.atomic
     def delete_avatar(self, request):
         user = request.user
         if user.avatar:
-            user.avatar.delete()
+            # Files are shared by content: blobs.references deletes the
+            # file once nothing references it.
             user.avatar = None
             user.save()
 
@@ -71,8 +85,8 @@ class UserProfileViewSet(UserViewSet):
     )
     def subscriptions(self, request):
         queryset = User.objects.filter(
-            # For user in users if user's authors include request.user
-            subscriptions_where_subscriber__author=request.user
+            # Authors whose subscribers include request.user
+            subscriptions_where_author__subscriber=request.user
         )
 
         pages = self.paginate_queryset(queryset)
@@ -94,6 +108,7 @@ class UserProfileViewSet(UserViewSet):
             return self.create_subscription(request, id)
         return self.delete_subscription(request, id)
 
+    @transaction.atomic
     def create_subscription(self, request, id):
         serializer = CreateSubscriptionSerializer(
             data={
@@ -108,8 +123,10 @@ class UserProfileViewSet(UserViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
     def delete_subscription(self, request, id):
-        subscription = Subscription.objects.filter(
+        # Locked so that concurrent requests decrement counters once.
+        subscription = Subscription.objects.select_for_update().filter(
             subscriber=request.user.id, author=id
         )
 
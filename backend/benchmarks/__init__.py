@@ -0,0 +1,12 @@
+"""API benchmarks on a generated dataset.
+
+Run from the backend directory::
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --compare baseline.json
+
+Requests go through the real URLconf and middleware in-process, against
+a test database seeded by ``benchmarks.dataset``. ``--compare`` exits
+with an error if a scenario got slower than the baseline by more than
+``--tolerance`` or makes more queries per request.
+"""
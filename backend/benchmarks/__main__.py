@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import sys
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram.settings")
+os.environ["DEBUG"] = "False"
+# Jobs left in the queue, so that no thread competes with the requests.
+os.environ["JOBS_MODE"] = "worker"
+os.environ.setdefault("REQUEST_LOG_LEVEL", "ERROR")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--ingredients", type=int, default=2000)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+    parser.add_argument("--favorites", type=int, default=20000)
+    parser.add_argument("--carts", type=int, default=5000)
+    parser.add_argument("--subscriptions", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="Run only this scenario, may be repeated.",
+    )
+    parser.add_argument("--output", help="Write the results to this file.")
+    parser.add_argument("--compare", help="Baseline results to compare to.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed latency increase over the baseline, 0.25 is 25%%.",
+    )
+    return parser
+
+
+def main():
+    options = get_parser().parse_args()
+    if options.requests < 2:
+        sys.exit("At least 2 requests per scenario are needed.")
+
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from benchmarks import dataset, runner, scenarios
+
+    unknown = set(options.scenarios or ()) - scenarios.SCENARIOS.keys()
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+
+    dataset_options = {
+        name: getattr(options, name)
+        for name in (
+            "seed",
+            "users",
+            "ingredients",
+            "recipes",
+            "ingredients_per_recipe",
+            "favorites",
+            "carts",
+            "subscriptions",
+        )
+    }
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        user, token = dataset.seed(**dataset_options)
+        server_name = settings.ALLOWED_HOSTS[0]
+        client = APIClient(SERVER_NAME=server_name)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        context = scenarios.Context(
+            APIClient(SERVER_NAME=server_name), client, user
+        )
+        results = {"dataset": dataset_options, "scenarios": {}}
+        for name, scenario in scenarios.SCENARIOS.items():
+            if options.scenarios and name not in options.scenarios:
+                continue
+            results["scenarios"][name] = runner.run(
+                scenario, context, options.requests, options.warmup
+            )
+            print(name, results["scenarios"][name], file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline["dataset"] != results["dataset"]:
+            print(
+                "Warning: the baseline used another dataset.", file=sys.stderr
+            )
+        regressions = runner.compare(results, baseline, options.tolerance)
+        if regressions:
+            sys.exit("Regressions:\n" + "\n".join(regressions))
+        print("No regressions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Deterministic synthetic dataset of the benchmarks."""
+import io
+from itertools import islice
+from random import Random
+
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.authtoken.models import Token
+
+from recipes import cart_totals, counters, feed, inverted_index
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingCart)
+from users.models import Subscription, User
+
+BATCH_SIZE = 1000
+INGREDIENT_WORDS = (
+    "мука", "молоко", "масло", "сахар", "соль", "яйцо", "сыр", "творог",
+    "рис", "гречка", "картофель", "морковь", "лук", "чеснок", "томат",
+    "перец", "курица", "говядина", "рыба", "яблоко",
+)
+MEASUREMENT_UNITS = ("г", "мл", "шт.", "ст. л.", "ч. л.")
+
+
+def sample_pairs(random, count, left_ids, right_ids, exclude_equal=False):
+    """Yield count distinct random (left, right) pairs."""
+    count = min(count, len(left_ids) * len(right_ids))
+    seen = set()
+    while len(seen) < count:
+        pair = (random.choice(left_ids), random.choice(right_ids))
+        if pair in seen or (exclude_equal and pair[0] == pair[1]):
+            continue
+        seen.add(pair)
+        yield pair
+
+
+def create(model, objects):
+    """bulk_create the objects a batch at a time, return them."""
+    objects = iter(objects)
+    created = []
+    while batch := list(islice(objects, BATCH_SIZE)):
+        created += model.objects.bulk_create(batch)
+    return created
+
+
+def seed(
+    seed=0,
+    users=1000,
+    ingredients=2000,
+    recipes=5000,
+    ingredients_per_recipe=8,
+    favorites=20000,
+    carts=5000,
+    subscriptions=10000,
+):
+    """Fill the database, return the benchmark user and its token.
+
+    The benchmark user is the first one; it follows, favorites and has
+    in the shopping cart its share of the relations like any other.
+    """
+    random = Random(seed)
+    ingredient_ids = [
+        ingredient.pk
+        for ingredient in create(
+            Ingredient,
+            (
+                Ingredient(
+                    name=f"{INGREDIENT_WORDS[n % len(INGREDIENT_WORDS)]} {n}",
+                    measurement_unit=random.choice(MEASUREMENT_UNITS),
+                )
+                for n in range(ingredients)
+            ),
+        )
+    ]
+    user_ids = [
+        user.pk
+        for user in create(
+            User,
+            (
+                User(
+                    username=f"user{n}",
+                    email=f"user{n}@example.com",
+                    first_name=f"Имя{n}",
+                    last_name=f"Фамилия{n}",
+                    password="!",
+                )
+                for n in range(users)
+            ),
+        )
+    ]
+    recipe_ids = [
+        recipe.pk
+        for recipe in create(
+            Recipe,
+            (
+                Recipe(
+                    author_id=random.choice(user_ids),
+                    name=f"Рецепт {n}",
+                    text=f"Описание рецепта {n}.",
+                    cooking_time=random.randint(5, 180),
+                )
+                for n in range(recipes)
+            ),
+        )
+    ]
+    create(
+        IngredientInRecipe,
+        (
+            IngredientInRecipe(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=random.randint(1, 500),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in random.sample(
+                ingredient_ids, min(ingredients_per_recipe, ingredients)
+            )
+        ),
+    )
+    for model, count in ((Favorite, favorites), (ShoppingCart, carts)):
+        create(
+            model,
+            (
+                model(user_id=user_id, recipe_id=recipe_id)
+                for user_id, recipe_id in sample_pairs(
+                    random, count, user_ids, recipe_ids
+                )
+            ),
+        )
+    create(
+        Subscription,
+        (
+            Subscription(subscriber_id=subscriber_id, author_id=author_id)
+            for subscriber_id, author_id in sample_pairs(
+                random, subscriptions, user_ids, user_ids, exclude_equal=True
+            )
+        ),
+    )
+
+    # bulk_create skips the signals maintaining these.
+    for field in counters.COUNTERS:
+        counters.reconcile(field)
+    call_command("rebuild_search_index", stdout=io.StringIO())
+    cart_totals.refresh_users(user_ids)
+    feed.rebuild()
+    inverted_index.invalidate()
+    cache.clear()
+
+    user = User.objects.get(pk=user_ids[0])
+    return user, Token.objects.create(user=user)
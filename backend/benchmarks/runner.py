@@ -0,0 +1,75 @@
+"""Timing of the scenarios and comparison against a baseline."""
+import statistics
+from time import perf_counter
+
+from django.db import connection
+
+
+class QueryCounter:
+    count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def call(scenario, context, number):
+    """Call the scenario, reading streamed bodies whose work is lazy."""
+    response = scenario(context, number)
+    if response.streaming:
+        b"".join(response.streaming_content)
+        response.close()
+    return response
+
+
+def run(scenario, context, requests, warmup):
+    """Call the scenario, return its throughput, latencies and queries."""
+    for number in range(warmup):
+        call(scenario, context, number)
+
+    latencies = []
+    errors = 0
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        started = perf_counter()
+        for number in range(warmup, warmup + requests):
+            start = perf_counter()
+            response = call(scenario, context, number)
+            latencies.append(perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+        elapsed = perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 3),
+        "p95_ms": round(percentiles[94] * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "queries_per_request": round(counter.count / requests, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of the results as messages."""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        if result["queries_per_request"] > previous["queries_per_request"]:
+            regressions.append(
+                f"{name}: {result['queries_per_request']} queries per "
+                f"request, was {previous['queries_per_request']}"
+            )
+        for key in ("p50_ms", "p95_ms"):
+            if result[key] > previous[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {result[key]}, was {previous[key]}"
+                )
+
+    return regressions
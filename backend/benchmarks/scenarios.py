@@ -0,0 +1,117 @@
+"""Requests of the benchmarks.
+
+A scenario is called with the context and the request number and
+returns the response. Anonymous scenarios use ``context.anonymous``,
+the others ``context.client``, authenticated by token as the benchmark
+user.
+"""
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+
+class Context:
+    def __init__(self, anonymous, client, user):
+        self.anonymous = anonymous
+        self.client = client
+        self.recipe_ids = list(
+            Recipe.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        self.author_ids = list(
+            Subscription.objects.filter(subscriber=user)
+            .order_by("author_id")
+            .values_list("author_id", flat=True)
+        ) or [user.pk]
+        self.ingredient_ids = list(
+            Recipe.objects.filter(pk=self.recipe_ids[0]).values_list(
+                "ingredients", flat=True
+            )
+        )
+        # Toggled recipes must start outside the favorites and cart.
+        self.unfavorited_ids = list(
+            Recipe.objects.exclude(
+                pk__in=Favorite.objects.filter(user=user).values("recipe")
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)[:100]
+        )
+        self.uncarted_ids = list(
+            Recipe.objects.exclude(
+                pk__in=ShoppingCart.objects.filter(user=user).values("recipe")
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)[:100]
+        )
+
+    def get_recipe_id(self, number):
+        return self.recipe_ids[number * 7919 % len(self.recipe_ids)]
+
+
+def recipes_anonymous(context, number):
+    return context.anonymous.get("/api/recipes/", {"page": number % 5 + 1})
+
+
+def recipes_authenticated(context, number):
+    return context.client.get("/api/recipes/", {"page": number % 5 + 1})
+
+
+def recipes_filtered(context, number):
+    filters = (
+        {"author": context.author_ids[number % len(context.author_ids)]},
+        {"is_favorited": 1},
+        {"is_in_shopping_cart": 1},
+        {
+            "ingredients": ",".join(map(str, context.ingredient_ids[:2])),
+            "match": "all",
+        },
+    )
+    return context.client.get("/api/recipes/", filters[number % len(filters)])
+
+
+def recipe_detail(context, number):
+    return context.client.get(
+        f"/api/recipes/{context.get_recipe_id(number)}/"
+    )
+
+
+def ingredients_search(context, number):
+    prefixes = ("мо", "мука", "с", "карт", "перец 1", "яй")
+    return context.anonymous.get(
+        "/api/ingredients/", {"name": prefixes[number % len(prefixes)]}
+    )
+
+
+def subscriptions(context, number):
+    return context.client.get("/api/users/subscriptions/")
+
+
+def download_shopping_cart(context, number):
+    return context.client.get("/api/recipes/download_shopping_cart/")
+
+
+def toggle(context, number, url_path, recipe_ids):
+    """Add on even numbers, remove the same recipe on odd ones."""
+    recipe_id = recipe_ids[number // 2 % len(recipe_ids)]
+    method = context.client.delete if number % 2 else context.client.post
+    return method(f"/api/recipes/{recipe_id}/{url_path}/")
+
+
+def favorite_toggle(context, number):
+    return toggle(context, number, "favorite", context.unfavorited_ids)
+
+
+def shopping_cart_toggle(context, number):
+    return toggle(context, number, "shopping_cart", context.uncarted_ids)
+
+
+# Writing scenarios go last, not to drop the caches of the others.
+SCENARIOS = {
+    "recipes_anonymous": recipes_anonymous,
+    "recipes_authenticated": recipes_authenticated,
+    "recipes_filtered": recipes_filtered,
+    "recipe_detail": recipe_detail,
+    "ingredients_search": ingredients_search,
+    "subscriptions": subscriptions,
+    "download_shopping_cart": download_shopping_cart,
+    "favorite_toggle": favorite_toggle,
+    "shopping_cart_toggle": shopping_cart_toggle,
+}
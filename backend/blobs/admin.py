@@ -0,0 +1,11 @@
+from django.contrib.admin import ModelAdmin, register
+
+from blobs.models import Blob
+from foodgram.admin import LargeTableAdminMixin
+
+
+@register(Blob)
+class BlobAdmin(LargeTableAdminMixin, ModelAdmin):
+    list_display = ("pk", "name", "references", "created")
+    search_fields = ("name",)
+    readonly_fields = ("name", "references", "created")
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class BlobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "blobs"
+    verbose_name = "Файлы"
+
+    def ready(self):
+        from blobs import signals
+
+        signals.connect()
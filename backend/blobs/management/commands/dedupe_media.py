@@ -0,0 +1,60 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blobs import references
+from blobs.storage import get_storage, is_hashed
+
+
+class Command(BaseCommand):
+    help = (
+        "Move uploaded images to content-addressed names, deleting "
+        "duplicates, and recount references of stored files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without changing it.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        drifted = references.recount(dry_run=dry_run)
+        self.stdout.write(f"References: {drifted} drifted")
+
+        storage = get_storage()
+        for label, field_names in references.FIELDS.items():
+            model = apps.get_model(label)
+            for field_name in field_names:
+                moved = 0
+                objects = (
+                    model.objects.exclude(**{field_name: ""})
+                    .only("pk", field_name, f"{field_name}_variants")
+                    .order_by("pk")
+                )
+                for instance in objects.iterator():
+                    field_file = getattr(instance, field_name)
+                    if is_hashed(field_file.name):
+                        continue
+                    if not storage.exists(field_file.name):
+                        self.stderr.write(f"Missing file {field_file.name}")
+                        continue
+                    moved += 1
+                    if dry_run:
+                        continue
+                    # Signals move the references in the transaction
+                    # storing the file, drop the old file once
+                    # unreferenced and regenerate variants.
+                    with transaction.atomic(), storage.open(
+                        field_file.name
+                    ) as file:
+                        field_file.name = storage.save(field_file.name, file)
+                        instance.save(update_fields=[field_name])
+
+                self.stdout.write(
+                    f"{model._meta.verbose_name_plural}: {moved} moved"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Media deduplicated."))
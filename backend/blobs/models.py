@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """Stored file with the number of fields referencing it."""
+
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Файл",
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Ссылок",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания",
+    )
+
+    class Meta:
+        verbose_name = "Файл"
+        verbose_name_plural = "Файлы"
+        ordering = ("id",)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,110 @@
+"""Reference counts of stored files.
+
+Signal handlers (see blobs.signals) acquire the new file of a field and
+release the old one in the transaction saving the instance. Files left
+without references are deleted, with their image variants, once it
+commits.
+"""
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+
+from blobs.models import Blob
+from blobs.storage import get_storage
+from foodgram import images
+
+# Model label: file fields kept in the blobs storage.
+FIELDS = {
+    "recipes.Recipe": ("image",),
+    "users.User": ("avatar",),
+}
+
+
+def acquire(name):
+    acquire_many([name])
+
+
+def acquire_many(names):
+    """Add a reference to every name, repeated names count repeatedly."""
+    references = Counter(names)
+    Blob.objects.bulk_create(
+        [Blob(name=name) for name in references], ignore_conflicts=True
+    )
+    names_by_count = defaultdict(list)
+    for name, total in references.items():
+        names_by_count[total].append(name)
+    for total, names in names_by_count.items():
+        Blob.objects.filter(name__in=names).update(
+            references=F("references") + total
+        )
+
+
+def release(name):
+    Blob.objects.filter(name=name, references__gt=0).update(
+        references=F("references") - 1
+    )
+    transaction.on_commit(lambda: collect([name]))
+
+
+def collect(names):
+    """Delete the files that are not referenced, return their names.
+
+    Files are deleted under the row locks, which uploads of the same
+    content wait for, see blobs.storage.
+    """
+    storage = get_storage()
+    with transaction.atomic():
+        names = list(
+            Blob.objects.select_for_update()
+            .filter(name__in=names, references=0)
+            .values_list("name", flat=True)
+        )
+        Blob.objects.filter(name__in=names).delete()
+        for name in names:
+            storage.delete(name)
+            images.delete(name)
+
+    return names
+
+
+def count():
+    """Return the actual number of references of each stored file."""
+    references = Counter()
+    for label, field_names in FIELDS.items():
+        model = apps.get_model(label)
+        for field_name in field_names:
+            references.update(
+                model.objects.exclude(**{field_name: ""}).values_list(
+                    field_name, flat=True
+                )
+            )
+
+    return references
+
+
+@transaction.atomic
+def recount(dry_run=False):
+    """Fix drifted counters, return how many files drifted."""
+    references = count()
+    counted = dict(Blob.objects.values_list("name", "references"))
+    drifted = {
+        name: references.get(name, 0)
+        for name in references.keys() | counted.keys()
+        if references.get(name, 0) != counted.get(name)
+    }
+    if dry_run or not drifted:
+        return len(drifted)
+
+    Blob.objects.bulk_create(
+        [Blob(name=name) for name in drifted.keys() - counted.keys()]
+    )
+    blobs = list(Blob.objects.filter(name__in=drifted))
+    for blob in blobs:
+        blob.references = drifted[blob.name]
+    Blob.objects.bulk_update(blobs, ["references"])
+    unreferenced = [name for name, total in drifted.items() if not total]
+    transaction.on_commit(lambda: collect(unreferenced))
+
+    return len(drifted)
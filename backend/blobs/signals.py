@@ -0,0 +1,56 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from blobs import references
+
+
+def get_field_names(sender, update_fields):
+    return [
+        field_name
+        for field_name in references.FIELDS[sender._meta.label]
+        if update_fields is None or field_name in update_fields
+    ]
+
+
+def remember_names(sender, instance, raw, update_fields, **kwargs):
+    field_names = get_field_names(sender, update_fields)
+    if raw or not field_names:
+        return
+
+    stored = {}
+    if instance.pk is not None:
+        stored = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values(*field_names)
+            .first()
+        ) or {}
+    instance._stored_names = {
+        field_name: stored.get(field_name) or "" for field_name in field_names
+    }
+
+
+def count_references(sender, instance, **kwargs):
+    stored_names = instance.__dict__.pop("_stored_names", {})
+    for field_name, stored_name in stored_names.items():
+        name = getattr(instance, field_name).name or ""
+        if name == stored_name:
+            continue
+        if name:
+            references.acquire(name)
+        if stored_name:
+            references.release(stored_name)
+
+
+def release_files(sender, instance, **kwargs):
+    for field_name in references.FIELDS[sender._meta.label]:
+        name = getattr(instance, field_name).name
+        if name:
+            references.release(name)
+
+
+def connect():
+    for label in references.FIELDS:
+        model = apps.get_model(label)
+        pre_save.connect(remember_names, sender=model)
+        post_save.connect(count_references, sender=model)
+        post_delete.connect(release_files, sender=model)
@@ -0,0 +1,62 @@
+"""Content-addressed file storage.
+
+Files are named by the SHA-256 of their content under two levels of
+shard directories, ``recipes/3f/a1/3fa1...e9.png``, so that an upload
+of a stored file writes nothing and a name never changes its content.
+References are counted by ``blobs.references``.
+
+Saving locks the file's Blob row until the surrounding transaction
+commits, so the file of a name whose last reference is being released
+is not collected before the new reference is taken. Save the file and
+take the reference in one transaction, as the API, admin, importer and
+dedupe_media do.
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+
+from blobs.models import Blob
+
+HASHED_NAME = re.compile(
+    r"(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}"
+)
+
+
+def get_hashed_name(name, digest):
+    """recipes/photo.PNG -> recipes/3f/a1/3fa1...e9.png"""
+    directory = posixpath.dirname(name)
+    extension = posixpath.splitext(name)[1]
+    return posixpath.join(
+        directory, digest[:2], digest[2:4], digest + extension.lower()
+    )
+
+
+def is_hashed(name):
+    return HASHED_NAME.search(name) is not None
+
+
+def get_storage():
+    return storages["blobs"]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        name = get_hashed_name(name, digest.hexdigest())
+        with transaction.atomic():
+            Blob.objects.bulk_create([Blob(name=name)], ignore_conflicts=True)
+            # Waits for blobs.references.collect deleting the file.
+            Blob.objects.select_for_update().get(name=name)
+            if self.exists(name):
+                return name
+
+            saved_name = super()._save(name, content)
+            if saved_name != name:
+                # The same content was written concurrently under the name.
+                self.delete(saved_name)
+        return name
@@ -0,0 +1,37 @@
+"""Admin helpers shared by the apps."""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from foodgram.constants import ADMIN_ESTIMATED_COUNT_MIN
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use the planner's row estimate for unfiltered big Postgres tables.
+
+    COUNT(*) scans the whole table there; the estimate is read from
+    pg_class and is as fresh as the last VACUUM or ANALYZE.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if connection.vendor == "postgresql" and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE relname = %s",
+                    (query.model._meta.db_table,),
+                )
+                row = cursor.fetchone()
+            if row is not None and row[0] >= ADMIN_ESTIMATED_COUNT_MIN:
+                return int(row[0])
+
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """Changelist settings for tables too big to count on every page."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
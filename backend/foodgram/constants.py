@@ -18,5 +18,87 @@ USER_FIRST_NAME_MAX_LENGTH = 150
 USER_LAST_NAME_MAX_LENGTH = 150
 USER_AVATAR_UPLOAD_TO = "users/"
 
+# Short links
+SHORT_LINK_ALPHABET = (  # Base62.
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+)
+SHORT_LINK_CODE_LENGTH = 6
+SHORT_LINK_CODE_ATTEMPTS = 3
+SHORT_LINK_CACHE_SIZE = 100000  # Resolved codes kept by each process.
+SHORT_LINK_MAX_AGE = 60 * 60 * 24 * 30
+SHORT_LINK_REDIRECT_URL = "/recipes/{recipe_id}"
+
+# Search
+RECIPE_SEARCH_CONFIG = "russian"
+RECIPE_INGREDIENTS_INDEX_MAX_AGE = 60  # Seconds, see recipes.inverted_index.
+
+# Feed
+FEED_FAN_OUT_MAX_FOLLOWERS = 10000  # Bigger audiences are merged on read.
+FEED_BACKFILL_SIZE = 100  # Recipes copied into a feed on subscription.
+FEED_BATCH_SIZE = 1000
+
+# Cache
+RECIPE_CACHE_KEY_PREFIX = "recipe-representation"
+RECIPE_CACHE_TIMEOUT = 60 * 60
+RECIPE_CACHE_VERSION = 4  # Bump when RecipeSerializer output changes.
+
+AUTH_TOKEN_CACHE_KEY_PREFIX = "auth-token:2"  # Bump when entries change.
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+AUTH_TOKEN_CACHE_SIZE = 10000  # Tokens kept by each process.
+
+# Shopping list
+SHOPPING_LIST_FILENAME = "shopping_list"
+SHOPPING_LIST_TITLE = "Список покупок"
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+SHOPPING_LIST_CHUNK_SIZE = 64 * 1024
+SHOPPING_LIST_PDF_RESOLUTION = 150  # dpi, A4 below is 210x297 mm.
+SHOPPING_LIST_PDF_PAGE_SIZE = (1240, 1754)
+SHOPPING_LIST_PDF_MARGIN = 120
+SHOPPING_LIST_PDF_FONT_SIZE = 28
+SHOPPING_LIST_PDF_LINE_HEIGHT = 44
+SHOPPING_CART_TOTALS_BATCH_SIZE = 1000
+
+# Import
+IMPORT_BATCH_SIZE = 1000  # Rows validated and inserted per transaction.
+
+# Favorite and shopping cart batches
+RELATION_BATCH_MAX_SIZE = 1000
+
+# Generated data
+GENERATE_BATCH_SIZE = 10000
+GENERATE_ZIPF_EXPONENT = 1.0
+GENERATE_MAX_FAVORITES = 2000  # Per user, the rest go to the next ones.
+GENERATE_MAX_CART = 50
+GENERATE_MAX_SUBSCRIPTIONS = 2000
+GENERATE_PERIOD_DAYS = 365  # Recipes are dated within the last period.
+
+# Request timings
+REQUEST_SLOW_QUERIES = 50
+REQUEST_SLOW_MS = 500
+REQUEST_SLOW_FINGERPRINTS = 5  # Most frequent queries of slow requests.
+
 # Admin
 INGREDIENT_INLINE_MIN_AMOUNT = 1
+ADMIN_ESTIMATED_COUNT_MIN = 100000  # Smaller tables are counted exactly.
+
+# Images
+IMAGE_VARIANTS_DIR = "variants"
+IMAGE_VARIANT_SIZES = {  # Bounding boxes, images are never upscaled.
+    "thumbnail": (160, 160),
+    "card": (640, 640),
+    "full": (1600, 1600),
+}
+IMAGE_VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_BACKGROUND = (255, 255, 255)  # For transparent JPEGs.
+IMAGE_UPLOAD_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+IMAGE_PENDING = "pending"
+IMAGE_READY = "ready"
+IMAGE_FAILED = "failed"
+
+# Jobs
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_DELAY = 30  # Seconds, multiplied by the attempt number.
+JOBS_LOCK_TIMEOUT = 10 * 60  # Running jobs older than this are retried.
+JOBS_POLL_INTERVAL = 1
+JOBS_THREADS = 2
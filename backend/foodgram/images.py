@@ -0,0 +1,210 @@
+"""Resized WebP and JPEG variants of uploaded images.
+
+Variants of ``<field>`` are listed in the ``<field>_variants`` JSON
+field of the model as ``{"source": <image name>, "sizes": {<size>:
+{<extension>: <file name>}}}``. A source differing from the current
+image name means the variants are out of date. Variant names derive
+from the image name, so fields sharing a stored image share variants,
+which are deleted with the image (see ``blobs.references``).
+
+Uploads are only sniffed in the request; decoding and resizing run in a
+job (see ``jobs.queue``) queued by ``refresh_later``. Models having a
+``<field>_status`` field track the job there.
+"""
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from foodgram.constants import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_READY,
+                                IMAGE_VARIANT_BACKGROUND,
+                                IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_QUALITY,
+                                IMAGE_VARIANT_SIZES, IMAGE_VARIANTS_DIR)
+from jobs import queue
+
+logger = logging.getLogger(__name__)
+
+
+def get_variant_name(name, size, extension):
+    """recipes/photo.png -> variants/recipes/photo/card.webp"""
+    stem = posixpath.splitext(name)[0]
+    return posixpath.join(IMAGE_VARIANTS_DIR, stem, f"{size}.{extension}")
+
+
+def encode(image, format):
+    if format == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, IMAGE_VARIANT_BACKGROUND)
+        if "A" in image.getbands():
+            background.paste(image, mask=image.getchannel("A"))
+        else:
+            background.paste(image.convert("RGB"))
+        image = background
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, quality=IMAGE_VARIANT_QUALITY)
+    return buffer.getvalue()
+
+
+def generate(field_file, force=False):
+    """Write every size and format of the image, return the variants."""
+    names = {
+        size: {
+            extension: get_variant_name(field_file.name, size, extension)
+            for extension in IMAGE_VARIANT_FORMATS
+        }
+        for size in IMAGE_VARIANT_SIZES
+    }
+    if not force and all(
+        default_storage.exists(name)
+        for files in names.values()
+        for name in files.values()
+    ):
+        # Shared by every field referencing the same stored file.
+        return {"source": field_file.name, "sizes": names}
+
+    delete(field_file.name)
+    variants = {"source": field_file.name, "sizes": {}}
+    try:
+        with field_file.open("rb"), Image.open(field_file) as original:
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ("RGB", "RGBA"):
+                transparent = (
+                    "A" in original.getbands()
+                    or "transparency" in original.info
+                )
+                original = original.convert("RGBA" if transparent else "RGB")
+            for size, bounds in IMAGE_VARIANT_SIZES.items():
+                image = original.copy()
+                image.thumbnail(bounds, Image.Resampling.LANCZOS)
+                variants["sizes"][size] = {
+                    extension: default_storage.save(
+                        names[size][extension],
+                        ContentFile(encode(image, format)),
+                    )
+                    for extension, format in IMAGE_VARIANT_FORMATS.items()
+                }
+    except (OSError, Image.DecompressionBombError):
+        # Kept with no sizes so that broken uploads are not retried.
+        logger.warning("Cannot make variants of %s.", field_file.name)
+
+    return variants
+
+
+def delete(name):
+    """Delete the variants of the image, once the image is deleted."""
+    for size in IMAGE_VARIANT_SIZES:
+        for extension in IMAGE_VARIANT_FORMATS:
+            default_storage.delete(get_variant_name(name, size, extension))
+
+
+def is_current(instance, field_name):
+    variants = getattr(instance, f"{field_name}_variants") or {}
+    source = getattr(instance, field_name).name or None
+    return variants.get("source") == source
+
+
+def update(instance, field_name, force=False):
+    """Set new variants and status on the instance, return their fields."""
+    variants_field = f"{field_name}_variants"
+    field_file = getattr(instance, field_name)
+    variants = generate(field_file, force) if field_file else {}
+    setattr(instance, variants_field, variants)
+
+    status_field = f"{field_name}_status"
+    if not hasattr(instance, status_field):
+        return [variants_field]
+    failed = field_file and not variants["sizes"]
+    setattr(instance, status_field, IMAGE_FAILED if failed else IMAGE_READY)
+    return [variants_field, status_field]
+
+
+def refresh(instance, field_name, force=False):
+    """Regenerate variants of instance.<field_name> if the image changed."""
+    if not force and is_current(instance, field_name):
+        return
+
+    fields = update(instance, field_name, force)
+    type(instance).objects.filter(pk=instance.pk).update(
+        **{field: getattr(instance, field) for field in fields}
+    )
+
+
+def refresh_later(instance, field_name):
+    """Queue regeneration of the variants if the image changed."""
+    refresh_many_later([instance], field_name)
+
+
+def refresh_many_later(instances, field_name):
+    """refresh_later for instances of one model, in two queries."""
+    instances = [
+        instance
+        for instance in instances
+        if not is_current(instance, field_name)
+    ]
+    if not instances:
+        return
+
+    model = type(instances[0])
+    status_field = f"{field_name}_status"
+    if hasattr(model, status_field):
+        model.objects.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).update(**{status_field: IMAGE_PENDING})
+        for instance in instances:
+            setattr(instance, status_field, IMAGE_PENDING)
+    queue.enqueue_many(
+        "foodgram.images.process",
+        [
+            {
+                "model": model._meta.label,
+                "pk": instance.pk,
+                "field_name": field_name,
+            }
+            for instance in instances
+        ],
+    )
+
+
+def process(model, pk, field_name):
+    """Job of refresh_later, saving so that signals drop stale caches.
+
+    Variants are made without a transaction; only saving them locks the
+    row, and only if the image did not change in the meantime.
+    """
+    model = apps.get_model(model)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or is_current(instance, field_name):
+        return
+
+    fields = update(instance, field_name)
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=pk).first()
+        if current is None or (
+            getattr(current, field_name).name
+            != getattr(instance, field_name).name
+        ):
+            # The new image has its own job.
+            return
+
+        for field in fields:
+            setattr(current, field, getattr(instance, field))
+        if hasattr(current, "updated"):
+            # Moves the Last-Modified and ETag of the instance.
+            fields.append("updated")
+        current.save(update_fields=fields)
+
+
+def get_urls(variants):
+    """Return {size: {extension: url}} of the variants."""
+    return {
+        size: {
+            extension: default_storage.url(name)
+            for extension, name in files.items()
+        }
+        for size, files in (variants or {}).get("sizes", {}).items()
+    }
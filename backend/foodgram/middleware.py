@@ -0,0 +1,177 @@
+"""Per-request timings: database, serialization and total time.
+
+Timings go to a ``Server-Timing`` header for staff (or with DEBUG) and
+to one ``foodgram.requests`` log line per request. Requests over the
+``REQUEST_SLOW_QUERIES`` or ``REQUEST_SLOW_MS`` settings are logged as
+warnings with their most frequent SQL fingerprints.
+
+Serialization is timed by wrapping ``BaseSerializer.data`` once per
+process, see ``instrument``; ``REQUEST_TIME_SERIALIZERS = False`` leaves
+serializers untouched and drops the ``serialize`` timing.
+"""
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+from foodgram.constants import (REQUEST_SLOW_FINGERPRINTS, REQUEST_SLOW_MS,
+                                REQUEST_SLOW_QUERIES)
+
+logger = logging.getLogger("foodgram.requests")
+
+FINGERPRINT_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+FINGERPRINT_LISTS = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+current = ContextVar("request_timings", default=None)
+
+
+def get_fingerprint(sql):
+    """SQL with literals and IN lists collapsed, to group alike queries."""
+    sql = FINGERPRINT_LITERALS.sub("%s", sql)
+    return FINGERPRINT_LISTS.sub("(...)", sql)
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+        self.fingerprints = Counter()
+        self.fingerprint_times = defaultdict(float)
+
+    def execute(self, execute, sql, params, many, context):
+        """Database execute wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            fingerprint = get_fingerprint(sql)
+            self.queries += 1
+            self.db += duration
+            self.fingerprints[fingerprint] += 1
+            self.fingerprint_times[fingerprint] += duration
+
+    def get_milliseconds(self):
+        return {
+            "db": self.db * 1000,
+            "serialize": self.serialize * 1000,
+            "total": (time.perf_counter() - self.started) * 1000,
+        }
+
+
+def timed_data(data):
+    """Wrap the serializer data property, counting only outer calls."""
+
+    def get_data(serializer):
+        timings = current.get()
+        if timings is None or timings.serializing:
+            return data.fget(serializer)
+
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            timings.serialize += time.perf_counter() - started
+            timings.serializing = False
+
+    get_data.untimed = data
+    return property(get_data)
+
+
+def instrument():
+    """Time the outermost serializer ``.data``, once however often called.
+
+    Nested serializers run through to_representation and are not timed
+    separately. Outside of a request the wrapper only reads the context.
+    """
+    data = serializers.BaseSerializer.data
+    if not hasattr(data.fget, "untimed"):
+        serializers.BaseSerializer.data = timed_data(data)
+
+
+def uninstrument():
+    """Restore the original ``BaseSerializer.data``."""
+    data = serializers.BaseSerializer.data
+    if hasattr(data.fget, "untimed"):
+        serializers.BaseSerializer.data = data.fget.untimed
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.serializers = getattr(settings, "REQUEST_TIME_SERIALIZERS", True)
+        if self.serializers:
+            instrument()
+
+    def __call__(self, request):
+        timings = Timings()
+        token = current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+
+        milliseconds = timings.get_milliseconds()
+        user = getattr(request, "user", None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            entries = [
+                f'db;dur={milliseconds["db"]:.1f};'
+                f'desc="{timings.queries} queries"',
+                f'serialize;dur={milliseconds["serialize"]:.1f}',
+                f'total;dur={milliseconds["total"]:.1f}',
+            ]
+            if not self.serializers:
+                del entries[1]
+            response["Server-Timing"] = ", ".join(entries)
+        self.log(request, response, timings, milliseconds)
+
+        return response
+
+    def log(self, request, response, timings, milliseconds):
+        message = (
+            "method=%s path=%s status=%s queries=%d db_ms=%.1f "
+            "serialize_ms=%.1f total_ms=%.1f"
+        )
+        args = [
+            request.method,
+            request.path,
+            response.status_code,
+            timings.queries,
+            milliseconds["db"],
+            milliseconds["serialize"],
+            milliseconds["total"],
+        ]
+        slow = timings.queries > getattr(
+            settings, "REQUEST_SLOW_QUERIES", REQUEST_SLOW_QUERIES
+        ) or milliseconds["total"] > getattr(
+            settings, "REQUEST_SLOW_MS", REQUEST_SLOW_MS
+        )
+        if not slow:
+            logger.info(message, *args)
+            return
+
+        for fingerprint, count in timings.fingerprints.most_common(
+            REQUEST_SLOW_FINGERPRINTS
+        ):
+            message += "\n  %dx %.1fms %s"
+            args += [
+                count,
+                timings.fingerprint_times[fingerprint] * 1000,
+                fingerprint,
+            ]
+        logger.warning("slow " + message, *args)
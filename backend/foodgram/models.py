@@ -0,0 +1,24 @@
+"""Model helpers shared by the apps."""
+
+
+class CounterFieldsMixin:
+    """Keep counter columns out of full saves of existing rows.
+
+    Counters are moved with F() updates only, see recipes.counters;
+    writing back the value an instance loaded would lose the moves made
+    since. Saves listing ``update_fields`` are left as they are.
+    """
+
+    COUNTER_FIELDS = ()
+
+    def save(self, **kwargs):
+        if not self._state.adding and not kwargs.get("force_insert") and (
+            kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(**kwargs)
@@ -31,10 +31,13 @@ INSTALLED_APPS = [
     "api.apps.ApiConfig",
     "recipes.apps.RecipesConfig",
     "users.apps.UsersConfig",
+    "jobs.apps.JobsConfig",
+    "blobs.apps.BlobsConfig",
     "django_filters",
 ]
 
 MIDDLEWARE = [
+    "foodgram.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -74,6 +77,24 @@ DATABASES = {
         "PORT": os.getenv("DB_PORT", default=None),
     }
 }
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    # Take the write lock upfront, so that requests and background jobs
+    # wait for each other instead of failing with "database is locked".
+    DATABASES["default"]["OPTIONS"] = {"transaction_mode": "IMMEDIATE"}
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="foodgram"),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", default=10000)),
+    }
 
 AUTH_USER_MODEL = "users.User"
 
@@ -110,13 +131,62 @@ STATIC_ROOT = BASE_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # Uploaded images, see blobs.storage.
+    "blobs": {
+        "BACKEND": "blobs.storage.ContentAddressedStorage",
+    },
+}
+
+# Requests logged as slow, see foodgram.middleware.
+REQUEST_SLOW_QUERIES = int(os.getenv("REQUEST_SLOW_QUERIES", default=50))
+REQUEST_SLOW_MS = int(os.getenv("REQUEST_SLOW_MS", default=500))
+# Wraps BaseSerializer.data to time serialization.
+REQUEST_TIME_SERIALIZERS = os.getenv(
+    "REQUEST_TIME_SERIALIZERS", default="True"
+).lower() in ("true", "1")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "foodgram.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# Share authenticated tokens between processes through CACHES.
+AUTH_TOKEN_SHARED_CACHE = os.getenv(
+    "AUTH_TOKEN_SHARED_CACHE", default="False"
+).lower() in ("true", "1")
+
+# "worker" leaves jobs to manage.py run_jobs, "thread" runs them in-process.
+JOBS_MODE = os.getenv("JOBS_MODE", default="thread")
+
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    "SHOPPING_LIST_PDF_FONT",
+    default="/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
+
 
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ],
     "PAGE_SIZE": DEFAULT_PAGE_SIZE,
 }
@@ -1,10 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
-from recipes.views import RecipeViewSet
+from recipes.views import legacy_short_link, short_link
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls", namespace="api")),
-    path("s/<int:pk>", RecipeViewSet.as_view({"get": "retrieve"})),
+    path("s/<int:pk>", legacy_short_link),
+    path("s/<str:code>", short_link),
 ]
@@ -0,0 +1,18 @@
+import logging
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Build in-process indexes, tolerating a database not migrated yet."""
+    from recipes import autocomplete
+
+    try:
+        autocomplete.get_index()
+    except DatabaseError:
+        logger.warning("Skipping index warm-up: database is not ready.")
+    finally:
+        # Forked workers must not share the master's connections.
+        connections.close_all()
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram.settings")
 
 application = get_wsgi_application()
+
+# Build in-memory indexes before gunicorn forks (--preload), so workers
+# share them copy-on-write.
+from foodgram.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,11 @@
+from django.contrib.admin import ModelAdmin, register
+
+from foodgram.admin import LargeTableAdminMixin
+from jobs.models import Job
+
+
+@register(Job)
+class JobAdmin(LargeTableAdminMixin, ModelAdmin):
+    list_display = ("pk", "function", "status", "attempts", "run_after")
+    list_filter = ("status",)
+    search_fields = ("function",)
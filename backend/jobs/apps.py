@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Фоновые задачи"
+
+    def ready(self):
+        from django.core import checks
+
+        from jobs.checks import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core import checks
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Worker changes reach web processes only through a shared cache."""
+    if getattr(settings, "JOBS_MODE", "thread") != "worker":
+        return []
+    if not settings.CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+        return []
+
+    return [
+        checks.Error(
+            "JOBS_MODE=worker needs a cache shared between processes.",
+            hint=(
+                "Set CACHE_BACKEND and CACHE_LOCATION, for example to "
+                "django.core.cache.backends.redis.RedisCache."
+            ),
+            id="jobs.E001",
+        )
+    ]
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodgram.constants import JOBS_POLL_INTERVAL
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs, polling for new ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when no job is due instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Waiting for jobs.")
+        while True:
+            queue.run_pending()
+            if options["once"]:
+                return
+            time.sleep(JOBS_POLL_INTERVAL)
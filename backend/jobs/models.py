@@ -0,0 +1,64 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Call of a function by its dotted path, run outside the request."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Ожидает"),
+        (RUNNING, "Выполняется"),
+        (FAILED, "Ошибка"),
+    )
+
+    function = models.CharField(
+        max_length=255,
+        verbose_name="Функция",
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name="Аргументы",
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток",
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Запустить после",
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Начало выполнения",
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания",
+    )
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="jobs_job_status_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.function} {self.kwargs}"
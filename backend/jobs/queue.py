@@ -0,0 +1,131 @@
+"""Database-backed job queue.
+
+Jobs are rows written in the transaction of the change that needs
+them, so they are never lost or run before it commits. Depending on
+the ``JOBS_MODE`` setting they are run by the ``run_jobs`` worker
+command (``worker``) or by a thread pool of the web process once the
+transaction commits (``thread``, handy in development). Finished jobs
+are deleted; jobs failing ``JOBS_MAX_ATTEMPTS`` times are kept as
+failed for the admin.
+
+Jobs run in autocommit mode and open their own transactions, so that
+slow work such as image resizing holds no row locks. They may run more
+than once and have to be idempotent.
+"""
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from foodgram.constants import (JOBS_LOCK_TIMEOUT, JOBS_MAX_ATTEMPTS,
+                                JOBS_POLL_INTERVAL, JOBS_RETRY_DELAY,
+                                JOBS_THREADS)
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Executor:
+    current = None
+
+    @classmethod
+    def submit(cls, function):
+        if cls.current is None:
+            cls.current = ThreadPoolExecutor(
+                # SQLite has a single writer anyway.
+                max_workers=(
+                    1 if connection.vendor == "sqlite" else JOBS_THREADS
+                ),
+                thread_name_prefix="jobs",
+            )
+        cls.current.submit(function)
+
+
+def enqueue(function, **kwargs):
+    """Schedule function(**kwargs), given by its dotted path."""
+    enqueue_many(function, [kwargs])
+
+
+def enqueue_many(function, kwargs_list):
+    """Schedule a call of the function for every kwargs of the list."""
+    Job.objects.bulk_create(
+        Job(function=function, kwargs=kwargs) for kwargs in kwargs_list
+    )
+    if getattr(settings, "JOBS_MODE", "thread") == "thread":
+        transaction.on_commit(lambda: Executor.submit(run_in_thread))
+
+
+def claim():
+    """Take the next due job, safe against concurrent workers."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(
+            status=Job.RUNNING,
+            locked_at__lt=now - timedelta(seconds=JOBS_LOCK_TIMEOUT),
+        )
+    )
+    for job in candidates[:JOBS_THREADS * 2]:
+        # The status check makes the update fail if another worker won.
+        claimed = Job.objects.filter(
+            pk=job.pk, status=job.status, locked_at=job.locked_at
+        ).update(status=Job.RUNNING, locked_at=now)
+        if claimed:
+            job.status, job.locked_at = Job.RUNNING, now
+            return job
+
+    return None
+
+
+def run(job):
+    try:
+        import_string(job.function)(**job.kwargs)
+    except Exception:
+        job.attempts += 1
+        job.error = traceback.format_exc()
+        if job.attempts < JOBS_MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=JOBS_RETRY_DELAY * job.attempts
+            )
+        else:
+            job.status = Job.FAILED
+            logger.exception("Job %s failed.", job)
+        job.save(update_fields=("attempts", "error", "status", "run_after"))
+    else:
+        job.delete()
+
+
+def run_pending():
+    """Run due jobs until there are none left."""
+    try:
+        while (job := claim()) is not None:
+            run(job)
+    finally:
+        close_old_connections()
+
+
+def run_in_thread():
+    """Run due jobs, then come back when the next retry is due."""
+    run_pending()
+    retry = (
+        Job.objects.filter(status=Job.PENDING)
+        .order_by("run_after")
+        .values_list("run_after", flat=True)
+        .first()
+    )
+    close_old_connections()
+    if retry is not None:
+        delay = (retry - timezone.now()).total_seconds()
+        timer = threading.Timer(
+            max(delay, JOBS_POLL_INTERVAL), Executor.submit, (run_in_thread,)
+        )
+        timer.daemon = True
+        timer.start()
@@ -1,14 +1,16 @@
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin, register
 
+from foodgram.admin import LargeTableAdminMixin
 from foodgram.constants import INGREDIENT_INLINE_MIN_AMOUNT
+from recipes import cart_totals, inverted_index
 from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
-                            ShoppingCart)
+                            ShoppingCart, ShortLink)
 from users.models import Subscription
 
 
 @register(Ingredient)
-class IngredientAdmin(ModelAdmin):
+class IngredientAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("pk", "name", "measurement_unit")
     search_fields = ("name",)
 
@@ -16,37 +18,83 @@ class IngredientAdmin(ModelAdmin):
 class IngredientInRecipeInline(admin.TabularInline):
     model = IngredientInRecipe
     min_num = INGREDIENT_INLINE_MIN_AMOUNT
+    extra = 0
+    autocomplete_fields = ("ingredient",)
+
+    def get_queryset(self, request):
+        # Rows are labelled with __str__, which reads both relations.
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("ingredient", "recipe")
+        )
 
 
 @register(Recipe)
-class RecipeAdmin(ModelAdmin):
-    list_display = ("pk", "name", "author", "get_favorites", "created")
-    list_filter = ("author", "name")
+class RecipeAdmin(LargeTableAdminMixin, ModelAdmin):
+    list_display = ("pk", "name", "author", "favorites_count", "created")
+    list_select_related = ("author",)
     search_fields = ("name", "author__username")
+    autocomplete_fields = ("author",)
     inlines = [IngredientInRecipeInline]
 
-    @admin.display(description="Количество добавлений рецепта в избранное")
-    def get_favorites(self, obj):
-        return obj.favorites.count()
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        inverted_index.reindex_recipe(form.instance.id)
+        cart_totals.refresh_recipe_carts(form.instance.id)
 
 
 @register(IngredientInRecipe)
-class IngredientInRecipe(ModelAdmin):
+class IngredientInRecipeAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("pk", "recipe", "ingredient", "amount")
+    list_select_related = ("recipe", "ingredient")
+    search_fields = ("recipe__name", "ingredient__name")
+    raw_id_fields = ("recipe",)
+    autocomplete_fields = ("ingredient",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        inverted_index.reindex_recipe(obj.recipe_id)
+        cart_totals.refresh_recipe_carts(obj.recipe_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        inverted_index.reindex_recipe(obj.recipe_id)
+        cart_totals.refresh_recipe_carts(obj.recipe_id)
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = set(queryset.values_list("recipe_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for recipe_id in recipe_ids:
+            inverted_index.reindex_recipe(recipe_id)
+            cart_totals.refresh_recipe_carts(recipe_id)
 
 
 @register(ShoppingCart)
-class ShoppingCartAdmin(ModelAdmin):
+class ShoppingCartAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("pk", "user", "recipe")
+    list_select_related = ("user", "recipe")
+    raw_id_fields = ("user", "recipe")
 
 
 @register(Subscription)
-class SubscriptionAdmin(ModelAdmin):
+class SubscriptionAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("pk", "subscriber", "author")
+    list_select_related = ("subscriber", "author")
     search_fields = ("subscriber__username", "author__username")
-    list_filter = ("subscriber", "author")
+    raw_id_fields = ("subscriber", "author")
 
 
 @register(Favorite)
-class FavoriteAdmin(ModelAdmin):
+class FavoriteAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("pk", "user", "recipe")
+    list_select_related = ("user", "recipe")
+    raw_id_fields = ("user", "recipe")
+
+
+@register(ShortLink)
+class ShortLinkAdmin(LargeTableAdminMixin, ModelAdmin):
+    list_display = ("pk", "code", "recipe")
+    list_select_related = ("recipe",)
+    search_fields = ("code",)
+    raw_id_fields = ("recipe",)
@@ -0,0 +1,82 @@
+"""In-process ingredient autocomplete index.
+
+The catalog is small and rarely changes, so it is kept in memory as a
+sorted list of normalized names. Prefix matches are found by binary
+search, the substring fallback scans a single joined string. The index
+is rebuilt when the ingredients change version moves.
+"""
+from bisect import bisect_left, bisect_right
+
+from api import versions
+from recipes.models import Ingredient
+
+SEPARATOR = "\n"
+
+
+def normalize(name):
+    return name.casefold().replace("ё", "е").replace(SEPARATOR, " ").strip()
+
+
+class IngredientIndex:
+    current = None
+    current_version = None
+
+    def __init__(self, ingredients):
+        entries = sorted(
+            (normalize(name), id, name, measurement_unit)
+            for id, name, measurement_unit in ingredients
+        )
+        self.keys = [key for key, *_ in entries]
+        self.items = [
+            {"id": id, "name": name, "measurement_unit": measurement_unit}
+            for _, id, name, measurement_unit in entries
+        ]
+        self.text = SEPARATOR.join(self.keys)
+        self.starts = []
+        position = 0
+        for key in self.keys:
+            self.starts.append(position)
+            position += len(key) + len(SEPARATOR)
+
+    def search(self, query):
+        """Return prefix matches first, then names containing the query."""
+        query = normalize(query)
+        if not query:
+            return list(self.items)
+
+        first = bisect_left(self.keys, query)
+        last = first
+        while last < len(self.keys) and self.keys[last].startswith(query):
+            last += 1
+
+        return self.items[first:last] + [
+            self.items[index] for index in self.find_contains(query)
+        ]
+
+    def find_contains(self, query):
+        """Yield indexes of names containing, but not starting with, query."""
+        position = self.text.find(query)
+        while position != -1:
+            index = bisect_right(self.starts, position) - 1
+            if position != self.starts[index]:
+                yield index
+            if index + 1 == len(self.starts):
+                return
+            position = self.text.find(query, self.starts[index + 1])
+
+
+def get_index():
+    version, = versions.get_versions(versions.INGREDIENTS)
+    if IngredientIndex.current_version != version:
+        IngredientIndex.current = IngredientIndex(
+            Ingredient.objects.order_by().values_list(
+                "id", "name", "measurement_unit"
+            )
+        )
+        IngredientIndex.current_version = version
+
+    return IngredientIndex.current
+
+
+def search(query):
+    return get_index().search(query)
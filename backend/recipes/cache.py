@@ -0,0 +1,93 @@
+"""Cache of the viewer independent part of recipe representations.
+
+Entries are keyed by recipe id and ``updated``, so a representation
+built from a row read before a concurrent change commits is written
+under the old key and never served after it. Changes leaving
+``updated`` alone (ingredient names, authors) delete the current
+entries on commit instead. Other processes only see both through a
+shared cache backend.
+"""
+from django.core.cache import cache
+
+from foodgram.constants import (RECIPE_CACHE_KEY_PREFIX, RECIPE_CACHE_TIMEOUT,
+                                RECIPE_CACHE_VERSION)
+from recipes.models import Recipe
+
+HITS_KEY = f"{RECIPE_CACHE_KEY_PREFIX}:hits"
+MISSES_KEY = f"{RECIPE_CACHE_KEY_PREFIX}:misses"
+
+
+def get_key(recipe_id, updated):
+    return f"{RECIPE_CACHE_KEY_PREFIX}:{recipe_id}:{updated.timestamp()}"
+
+
+def get_representation(recipe):
+    return get_representations([recipe]).get(recipe.id)
+
+
+def get_representations(recipes):
+    """Read the entries of a page in one round trip, by recipe id."""
+    keys = {
+        get_key(recipe.id, recipe.updated): recipe.id for recipe in recipes
+    }
+    entries = cache.get_many(keys, version=RECIPE_CACHE_VERSION)
+    increment(HITS_KEY, len(entries))
+    increment(MISSES_KEY, len(keys) - len(entries))
+
+    return {keys[key]: data for key, data in entries.items()}
+
+
+def set_representation(recipe, data):
+    set_representations({recipe: data})
+
+
+def set_representations(representations):
+    """Write entries of recipe to data in one round trip."""
+    cache.set_many(
+        {
+            get_key(recipe.id, recipe.updated): data
+            for recipe, data in representations.items()
+        },
+        timeout=RECIPE_CACHE_TIMEOUT,
+        version=RECIPE_CACHE_VERSION,
+    )
+
+
+def invalidate(recipe_ids):
+    """Delete the entries of the current versions of the recipes."""
+    cache.delete_many(
+        [
+            get_key(recipe_id, updated)
+            for recipe_id, updated in Recipe.objects.filter(
+                pk__in=recipe_ids
+            ).values_list("id", "updated")
+        ],
+        version=RECIPE_CACHE_VERSION,
+    )
+
+
+def increment(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def get_stats():
+    counters = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
+
+
+def reset_stats():
+    cache.delete_many((HITS_KEY, MISSES_KEY))
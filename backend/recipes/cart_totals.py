@@ -0,0 +1,137 @@
+"""Maintenance of the materialized per-user shopping cart totals."""
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.db.models.functions import Greatest
+
+from api import versions
+from foodgram.constants import SHOPPING_CART_TOTALS_BATCH_SIZE
+from recipes.models import IngredientInRecipe, ShoppingCart, ShoppingCartTotal
+
+
+def get_recipe_amounts(recipe_id):
+    return dict(
+        IngredientInRecipe.objects.filter(recipe_id=recipe_id)
+        .order_by()
+        .values_list("ingredient_id", "amount")
+    )
+
+
+def get_delta(old_amounts, new_amounts):
+    delta = {
+        ingredient_id: amount - old_amounts.get(ingredient_id, 0)
+        for ingredient_id, amount in new_amounts.items()
+    }
+    for ingredient_id, amount in old_amounts.items():
+        delta.setdefault(ingredient_id, -amount)
+
+    return {
+        ingredient_id: amount
+        for ingredient_id, amount in delta.items()
+        if amount
+    }
+
+
+def apply_delta(user_ids, delta):
+    """Add per-ingredient amounts to the totals of every given user."""
+    if not user_ids or not delta:
+        return
+
+    with transaction.atomic():
+        ShoppingCartTotal.objects.bulk_create(
+            (
+                ShoppingCartTotal(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=0
+                )
+                for user_id in user_ids
+                for ingredient_id, amount in delta.items()
+                if amount > 0
+            ),
+            batch_size=SHOPPING_CART_TOTALS_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        totals = ShoppingCartTotal.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=delta
+        )
+        totals.update(
+            amount=Greatest(
+                F("amount")
+                + Case(
+                    *(
+                        When(ingredient_id=ingredient_id, then=Value(amount))
+                        for ingredient_id, amount in delta.items()
+                    ),
+                    default=Value(0),
+                ),
+                Value(0),
+            )
+        )
+        totals.filter(amount=0).delete()
+
+    versions.bump(*(versions.get_cart_name(user_id) for user_id in user_ids))
+
+
+def add_recipe(user_id, recipe_id):
+    apply_delta([user_id], get_recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id, recipe_id):
+    apply_delta([user_id], get_delta(get_recipe_amounts(recipe_id), {}))
+
+
+def update_recipe(recipe_id, old_amounts, new_amounts):
+    """Carry an ingredient edit over to the carts containing the recipe."""
+    delta = get_delta(old_amounts, new_amounts)
+    if not delta:
+        return
+
+    user_ids = list(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    for start in range(0, len(user_ids), SHOPPING_CART_TOTALS_BATCH_SIZE):
+        apply_delta(
+            user_ids[start:start + SHOPPING_CART_TOTALS_BATCH_SIZE], delta
+        )
+
+
+def compute_totals(user_ids=None):
+    """Yield (user id, ingredient id, amount) straight from the carts."""
+    carts = ShoppingCart.objects.all()
+    if user_ids is not None:
+        carts = carts.filter(user_id__in=user_ids)
+
+    return (
+        carts.filter(recipe__ingredients_in_recipe__isnull=False)
+        .values_list("user_id", "recipe__ingredients_in_recipe__ingredient_id")
+        .annotate(amount=Sum("recipe__ingredients_in_recipe__amount"))
+        .order_by()
+        .iterator(chunk_size=SHOPPING_CART_TOTALS_BATCH_SIZE)
+    )
+
+
+def refresh_users(user_ids):
+    """Recompute totals of the given users from their carts."""
+    user_ids = list(user_ids)
+    with transaction.atomic():
+        ShoppingCartTotal.objects.filter(user_id__in=user_ids).delete()
+        ShoppingCartTotal.objects.bulk_create(
+            (
+                ShoppingCartTotal(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=amount
+                )
+                for user_id, ingredient_id, amount in compute_totals(user_ids)
+            ),
+            batch_size=SHOPPING_CART_TOTALS_BATCH_SIZE,
+        )
+
+    versions.bump(*(versions.get_cart_name(user_id) for user_id in user_ids))
+
+
+def refresh_recipe_carts(recipe_id):
+    """Recompute totals of everyone having the recipe in the cart."""
+    refresh_users(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            "user_id", flat=True
+        )
+    )
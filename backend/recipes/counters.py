@@ -0,0 +1,70 @@
+"""Denormalized relation counters.
+
+Counters are moved with ``F()`` updates by the signal handlers of the
+relation, inside the transaction that changes it, so concurrent changes
+never lose an increment. ``reconcile`` recounts them from the relations.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+# Counter field: (model, related model, its foreign key to the model).
+COUNTERS = {
+    "favorites_count": (Recipe, Favorite, "recipe"),
+    "recipes_count": (User, Recipe, "author"),
+    "subscribers_count": (User, Subscription, "author"),
+    "shopping_cart_count": (User, ShoppingCart, "user"),
+}
+
+
+def add(field, pk, delta):
+    add_many(field, [pk], delta)
+
+
+def add_many(field, pks, delta):
+    model, *_ = COUNTERS[field]
+    model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def get_actual_count(related_model, related_field):
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{related_field: OuterRef("pk")})
+            .order_by()
+            .values(related_field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+@transaction.atomic
+def reconcile(field, pks=None, dry_run=False):
+    """Recount the field where it drifted, returning how many rows did."""
+    model, related_model, related_field = COUNTERS[field]
+    objects = model.objects.all()
+    if pks is not None:
+        objects = objects.filter(pk__in=pks)
+
+    drifted_pks = list(
+        objects.annotate(
+            actual_count=get_actual_count(related_model, related_field)
+        )
+        .exclude(**{field: F("actual_count")})
+        .values_list("pk", flat=True)
+    )
+    if drifted_pks and not dry_run:
+        model.objects.filter(pk__in=drifted_pks).update(
+            **{field: get_actual_count(related_model, related_field)}
+        )
+
+    return len(drifted_pks)
+
+
+def reconcile_on_commit(field, pk):
+    """Recount after fixture loading, which bypasses the increments."""
+    transaction.on_commit(lambda: reconcile(field, [pk]))
@@ -0,0 +1,198 @@
+"""Timeline of recipes from the authors a user follows.
+
+Recipes of ordinary authors are fanned out on write into FeedEntry
+rows, so reading a feed is a range scan of one index. The writes run as
+jobs after the recipe commits, so creating a recipe does not wait for
+its followers' feeds. Authors with more
+than ``FEED_FAN_OUT_MAX_FOLLOWERS`` followers would make every new
+recipe write that many rows; their recipes are instead merged in on
+read. The strategy is chosen with the ``RECIPE_FEED_STRATEGY`` setting:
+``hybrid`` (default) as described, or ``fan_in`` to query recipes of
+all followed authors directly.
+
+Feeds are returned as querysets of ``{"created", "recipe_id"}`` rows,
+ready for cursor pagination over ("-created", "-recipe_id").
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from foodgram.constants import (FEED_BACKFILL_SIZE, FEED_BATCH_SIZE,
+                                FEED_FAN_OUT_MAX_FOLLOWERS)
+from jobs import queue
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription, User
+
+
+class MergedQuerySet:
+    """Queryset stand-in merging sorted querysets of the same rows.
+
+    Implements only what cursor pagination calls: order_by, filter and
+    slicing.
+    """
+
+    def __init__(self, querysets, ordering=()):
+        self.querysets = querysets
+        self.ordering = ordering
+
+    def order_by(self, *fields):
+        return MergedQuerySet(
+            [queryset.order_by(*fields) for queryset in self.querysets],
+            fields,
+        )
+
+    def filter(self, *args, **kwargs):
+        return MergedQuerySet(
+            [queryset.filter(*args, **kwargs) for queryset in self.querysets],
+            self.ordering,
+        )
+
+    def __getitem__(self, item):
+        """Merge the first item.stop rows of every queryset."""
+        fields = [field.lstrip("-") for field in self.ordering]
+        rows = heapq.merge(
+            *(queryset[:item.stop] for queryset in self.querysets),
+            key=lambda row: [row[field] for field in fields],
+            reverse=self.ordering[0].startswith("-"),
+        )
+        return list(islice(rows, item.start, item.stop))
+
+
+def is_fanned_out(author_id):
+    return User.objects.filter(
+        pk=author_id, subscribers_count__lte=FEED_FAN_OUT_MAX_FOLLOWERS
+    ).exists()
+
+
+def get_fan_in_author_ids(user):
+    """Return ids of followed authors whose recipes are not fanned out."""
+    return list(
+        user.subscriptions_where_subscriber.order_by()
+        .filter(author__subscribers_count__gt=FEED_FAN_OUT_MAX_FOLLOWERS)
+        .values_list("author_id", flat=True)
+    )
+
+
+def get_recipe_rows(recipes):
+    return recipes.order_by().values("created", recipe_id=F("id"))
+
+
+def get_hybrid_feed(user):
+    fan_in_author_ids = get_fan_in_author_ids(user)
+    entries = (
+        FeedEntry.objects.filter(user=user)
+        .exclude(author_id__in=fan_in_author_ids)
+        .values("created", "recipe_id")
+    )
+    if not fan_in_author_ids:
+        return entries
+
+    return MergedQuerySet(
+        [
+            entries,
+            get_recipe_rows(
+                Recipe.objects.filter(author_id__in=fan_in_author_ids)
+            ),
+        ]
+    )
+
+
+def get_fan_in_feed(user):
+    return get_recipe_rows(
+        Recipe.objects.filter(
+            author__subscriptions_where_author__subscriber=user
+        )
+    )
+
+
+STRATEGIES = {
+    "hybrid": get_hybrid_feed,
+    "fan_in": get_fan_in_feed,
+}
+
+
+def get_feed(user, strategy=None):
+    strategy = strategy or getattr(settings, "RECIPE_FEED_STRATEGY", "hybrid")
+    return STRATEGIES[strategy](user)
+
+
+def add_entries(user_ids, recipes):
+    """Insert (created, id, author id) recipes into the users' feeds."""
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                author_id=author_id,
+                recipe_id=recipe_id,
+                created=created,
+            )
+            for user_id in user_ids
+            for created, recipe_id, author_id in recipes
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def get_subscriber_ids(author_id):
+    return list(
+        Subscription.objects.filter(author_id=author_id)
+        .order_by()
+        .values_list("subscriber_id", flat=True)
+    )
+
+
+def get_latest_recipes(author_id):
+    return list(
+        Recipe.objects.filter(author_id=author_id)
+        .order_by("-created", "-id")
+        .values_list("created", "id", "author_id")[:FEED_BACKFILL_SIZE]
+    )
+
+
+def fan_out_later(author_id, recipe_ids):
+    """Queue writing new recipes of one author into their followers' feeds."""
+    queue.enqueue(
+        "recipes.feed.fan_out", author_id=author_id, recipe_ids=recipe_ids
+    )
+
+
+@transaction.atomic
+def fan_out(author_id, recipe_ids):
+    """Job of fan_out_later, skipping recipes deleted in the meantime."""
+    if is_fanned_out(author_id):
+        add_entries(
+            get_subscriber_ids(author_id),
+            list(
+                Recipe.objects.filter(
+                    author_id=author_id, pk__in=recipe_ids
+                ).values_list("created", "id", "author_id")
+            ),
+        )
+
+
+def backfill(user_id, author_id):
+    """Copy the author's latest recipes into a new follower's feed."""
+    if is_fanned_out(author_id):
+        add_entries([user_id], get_latest_recipes(author_id))
+
+
+def remove_author(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+@transaction.atomic
+def rebuild():
+    """Recreate every feed from the current subscriptions."""
+    FeedEntry.objects.all().delete()
+    author_ids = User.objects.filter(
+        subscribers_count__gt=0,
+        subscribers_count__lte=FEED_FAN_OUT_MAX_FOLLOWERS,
+    ).values_list("pk", flat=True)
+    for author_id in list(author_ids):
+        add_entries(
+            get_subscriber_ids(author_id), get_latest_recipes(author_id)
+        )
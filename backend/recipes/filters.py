@@ -1,8 +1,11 @@
 import django_filters
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework
 from django_filters.rest_framework import FilterSet
 
-from recipes.models import Ingredient, Recipe
+from recipes import inverted_index
+from recipes.models import Ingredient, IngredientInRecipe, Recipe
+from recipes.search import get_backend
 
 
 class IngredientFilter(FilterSet):
@@ -13,7 +16,49 @@ class IngredientFilter(FilterSet):
         fields = ("name",)
 
 
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+def has_ingredients(**filters):
+    return Exists(
+        IngredientInRecipe.objects.filter(recipe=OuterRef("pk"), **filters)
+    )
+
+
+class RankedQuerySet:
+    """Queryset stand-in ordering recipes by precomputed ids.
+
+    Implements what page number pagination calls, count and slicing, and
+    loads the recipes of the page only. Other queryset methods act on the
+    unordered recipes, e.g. for cursor pagination or get_object.
+    """
+
+    def __init__(self, queryset, ids):
+        self.queryset = queryset
+        self.ids = ids
+
+    def count(self):
+        return len(self.ids)
+
+    def __getitem__(self, item):
+        ids = self.ids[item]
+        recipes = {
+            recipe.id: recipe for recipe in self.queryset.filter(id__in=ids)
+        }
+        return [recipes[id] for id in ids if id in recipes]
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
+
+
 class RecipeFilter(django_filters.FilterSet):
+    search = django_filters.filters.CharFilter(method="search_filter")
+    ingredients = NumberInFilter(method="ingredients_filter")
+    match = django_filters.filters.ChoiceFilter(
+        choices=(("all", "all"), ("any", "any")),
+        method="match_filter",
+    )
     is_favorited = django_filters.filters.BooleanFilter(
         method="is_recipe_in_favorites_filter"
     )
@@ -23,16 +68,66 @@ class RecipeFilter(django_filters.FilterSet):
 
     def is_recipe_in_favorites_filter(self, queryset, name, value):
         if value:
-            user = self.request.user
-            return queryset.filter(favorites__user_id=user.id)
+            return queryset.filter(is_favorited=True)
         return queryset
 
     def is_recipe_in_shoppingcart_filter(self, queryset, name, value):
         if value:
-            user = self.request.user
-            return queryset.filter(shopping_recipe__user_id=user.id)
+            return queryset.filter(is_in_shopping_cart=True)
+        return queryset
+
+    def search_filter(self, queryset, name, value):
+        return get_backend().search(queryset, value)
+
+    def ingredients_filter(self, queryset, name, value):
+        """Keep recipes with all or any of the ingredients.
+
+        Their ranking is left to filter_queryset, once every filter ran.
+        """
+        ingredient_ids = {int(id) for id in value}
+        match_all = self.form.cleaned_data.get("match") != "any"
+        self.coverage = inverted_index.match(ingredient_ids, match_all)
+        if match_all:
+            for ingredient_id in ingredient_ids:
+                queryset = queryset.filter(
+                    has_ingredients(ingredient_id=ingredient_id)
+                )
+            return queryset
+
+        return queryset.filter(
+            has_ingredients(ingredient_id__in=ingredient_ids)
+        )
+
+    def filter_queryset(self, queryset):
+        """Rank ingredient matches once every filter ran.
+
+        Recipes are ordered by the share of their ingredients in the set,
+        read from the index, then by date; only the page is loaded.
+        """
+        self.coverage = None
+        queryset = super().filter_queryset(queryset)
+        if self.coverage is None:
+            return queryset
+
+        # Recipes the index has not seen yet come last.
+        rows = sorted(
+            queryset.order_by().values_list("id", "created"),
+            key=lambda row: (self.coverage.get(row[0], 0), row[1], row[0]),
+            reverse=True,
+        )
+        return RankedQuerySet(queryset, [id for id, _ in rows])
+
+    def match_filter(self, queryset, name, value):
+        # Only read by ingredients_filter.
         return queryset
 
     class Meta:
         model = Recipe
-        fields = ("author", "is_favorited", "is_in_shopping_cart")
+        fields = (
+            "author",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "search",
+            "ingredients",
+            "match",
+        )
@@ -0,0 +1,365 @@
+"""Synthetic data at production scale, see the generate_data command.
+
+Users, recipes and ingredients get random popularity ranks, and the
+relations are drawn from Zipf distributions over them, P(rank) ~
+1 / rank ** exponent: a few authors write most recipes, a few are
+followed by most users, a few recipes collect most favorites and a few
+users are the most active. Rows are generated lazily and written a
+batch at a time, with ``COPY`` on PostgreSQL and ``executemany``
+elsewhere, so memory is bounded by the id arrays rather than by the row
+count. The same seed and an empty database give the same data, dated
+relative to the time of the run.
+
+Raw inserts skip the signals, so counters and the search index are
+rebuilt at the end, and shopping cart totals and feeds of the new users
+are filled with ``INSERT ... SELECT``.
+"""
+import io
+import json
+from array import array
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate, islice
+from random import Random
+
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.db.models import F, Max, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from api import versions
+from foodgram.constants import (FEED_BACKFILL_SIZE, FEED_FAN_OUT_MAX_FOLLOWERS,
+                                GENERATE_BATCH_SIZE, GENERATE_MAX_CART,
+                                GENERATE_MAX_FAVORITES,
+                                GENERATE_MAX_SUBSCRIPTIONS,
+                                GENERATE_PERIOD_DAYS, GENERATE_ZIPF_EXPONENT)
+from recipes import counters, inverted_index
+from recipes.models import (Favorite, FeedEntry, Ingredient,
+                            IngredientInRecipe, Recipe, ShoppingCart,
+                            ShoppingCartTotal)
+from users.models import Subscription, User
+
+
+def get_weights(size, exponent):
+    return (1 / rank**exponent for rank in range(1, size + 1))
+
+
+class Zipf:
+    """Draw ids, the one at rank r with probability ~ 1 / r ** exponent."""
+
+    def __init__(self, random, ids, exponent):
+        self.random = random
+        self.ids = ids
+        self.cum_weights = array(
+            "d", accumulate(get_weights(len(ids), exponent))
+        )
+
+    def draw(self):
+        weight = self.random.random() * self.cum_weights[-1]
+        return self.ids[bisect(self.cum_weights, weight)]
+
+    def sample(self, count):
+        """Return count distinct ids."""
+        if count > len(self.ids) // 2:
+            # Drawing most of the tail would take forever.
+            return self.random.sample(self.ids, min(count, len(self.ids)))
+        sample = set()
+        while len(sample) < count:
+            sample.add(self.draw())
+        return sample
+
+
+def spread(random, total, size, exponent, limit):
+    """Yield the share of total of each rank, at most limit each."""
+    remaining_weight = sum(get_weights(size, exponent))
+    for weight in get_weights(size, exponent):
+        share = total * weight / remaining_weight if remaining_weight else 0
+        count = min(limit, total, int(share + random.random()))
+        total -= count
+        remaining_weight -= weight
+        yield count
+
+
+def get_ranked(random, ids):
+    """Return the ids in a random order of popularity."""
+    ranked = array("q", ids)
+    random.shuffle(ranked)
+    return ranked
+
+
+def prepare(field, value):
+    if isinstance(field, models.JSONField):
+        return json.dumps(value)
+    return field.get_db_prep_save(value, connection)
+
+
+def to_copy_text(value):
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def write(cursor, table, columns, rows):
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(map(quote_name, columns))
+    if connection.vendor == "postgresql":
+        buffer = io.StringIO(
+            "".join(
+                "\t".join(map(to_copy_text, row)) + "\n" for row in rows
+            )
+        )
+        cursor.copy_expert(
+            f"COPY {quote_name(table)} ({columns}) FROM STDIN", buffer
+        )
+    else:
+        placeholders = ", ".join(["%s"] * len(rows[0]))
+        cursor.executemany(
+            f"INSERT INTO {quote_name(table)} ({columns}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+
+@transaction.atomic
+def insert(model, field_names, rows, batch_size=GENERATE_BATCH_SIZE):
+    """Write tuples of the fields, other columns get their defaults."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    others = [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field not in fields
+    ]
+    defaults = tuple(prepare(field, field.get_default()) for field in others)
+    columns = [field.column for field in fields + others]
+    # Ids are already what the database stores.
+    prepared = [
+        index for index, field in enumerate(fields) if not field.is_relation
+    ]
+
+    rows = iter(rows)
+    written = 0
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, batch_size)):
+            batch = [list(row) for row in batch]
+            for row in batch:
+                for index in prepared:
+                    row[index] = prepare(fields[index], row[index])
+            write(
+                cursor,
+                model._meta.db_table,
+                columns,
+                [tuple(row) + defaults for row in batch],
+            )
+            written += len(batch)
+
+    return written
+
+
+@transaction.atomic
+def insert_from(model, field_names, queryset):
+    """INSERT ... SELECT the rows of the queryset, return their count."""
+    sql, params = queryset.query.sql_with_params()
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(model._meta.get_field(name).column) for name in field_names
+    )
+    table = quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({columns}) {sql}", params)
+        return cursor.rowcount
+
+
+def get_new_ids(model, last_id):
+    return array(
+        "q",
+        model.objects.filter(pk__gt=last_id)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=GENERATE_BATCH_SIZE),
+    )
+
+
+def get_last_id(model):
+    return model.objects.aggregate(last_id=Max("pk"))["last_id"] or 0
+
+
+def get_pairs(random, total, owners, targets, exponent, limit):
+    """Yield distinct (owner, target) pairs, popular ones more often."""
+    zipf = Zipf(random, targets, exponent)
+    for owner, count in zip(
+        owners, spread(random, total, len(owners), exponent, limit)
+    ):
+        for target in sorted(zipf.sample(count)) if count else ():
+            if target != owner:
+                yield owner, target
+
+
+def generate(
+    users,
+    recipes,
+    ingredients_per_recipe,
+    favorites,
+    carts,
+    subscriptions,
+    seed=0,
+    exponent=GENERATE_ZIPF_EXPONENT,
+    batch_size=GENERATE_BATCH_SIZE,
+):
+    """Generate the data, yielding (stage, rows written) as it goes."""
+    random = Random(seed)
+    now = timezone.now()
+    ingredient_ids = get_ranked(
+        random, Ingredient.objects.order_by("pk").values_list("pk", flat=True)
+    )
+
+    last_user_id = get_last_id(User)
+    yield "users", insert(
+        User,
+        ("username", "email", "first_name", "last_name", "password"),
+        (
+            (
+                f"user{last_user_id + n}",
+                f"user{last_user_id + n}@example.com",
+                f"Имя{n}",
+                f"Фамилия{n}",
+                "!",
+            )
+            for n in range(1, users + 1)
+        ),
+        batch_size,
+    )
+    user_ids = get_new_ids(User, last_user_id)
+    # Separate ranks: the most active users, prolific authors and followed
+    # authors differ, which keeps feeds at about subscriptions times
+    # recipes per author instead of FEED_BACKFILL_SIZE per subscription.
+    authors = get_ranked(random, user_ids)
+    followed_authors = get_ranked(random, user_ids)
+    active_users = get_ranked(random, user_ids)
+
+    last_recipe_id = get_last_id(Recipe)
+    author_zipf = Zipf(random, authors, exponent)
+
+    def get_recipe(n):
+        created = now - timedelta(
+            seconds=random.randrange(GENERATE_PERIOD_DAYS * 24 * 60 * 60)
+        )
+        return (
+            author_zipf.draw(),
+            f"Рецепт {last_recipe_id + n}",
+            f"Описание рецепта {last_recipe_id + n}.",
+            random.randint(5, 180),
+            created,
+            created,
+        )
+
+    yield "recipes", insert(
+        Recipe,
+        ("author", "name", "text", "cooking_time", "created", "updated"),
+        (get_recipe(n) for n in range(1, recipes + 1)),
+        batch_size,
+    )
+    recipe_ids = get_ranked(random, get_new_ids(Recipe, last_recipe_id))
+
+    ingredient_zipf = Zipf(random, ingredient_ids, exponent)
+    yield "ingredients in recipes", insert(
+        IngredientInRecipe,
+        ("recipe", "ingredient", "amount"),
+        (
+            (recipe_id, ingredient_id, random.randint(1, 500))
+            for recipe_id in recipe_ids
+            for ingredient_id in sorted(
+                ingredient_zipf.sample(
+                    random.randint(
+                        max(1, ingredients_per_recipe // 2),
+                        ingredients_per_recipe + ingredients_per_recipe // 2,
+                    )
+                )
+            )
+        ),
+        batch_size,
+    )
+    for stage, model, total, limit in (
+        ("favorites", Favorite, favorites, GENERATE_MAX_FAVORITES),
+        ("shopping carts", ShoppingCart, carts, GENERATE_MAX_CART),
+    ):
+        yield stage, insert(
+            model,
+            ("user", "recipe"),
+            get_pairs(
+                random, total, active_users, recipe_ids, exponent, limit
+            ),
+            batch_size,
+        )
+    yield "subscriptions", insert(
+        Subscription,
+        ("subscriber", "author"),
+        get_pairs(
+            random,
+            subscriptions,
+            active_users,
+            followed_authors,
+            exponent,
+            GENERATE_MAX_SUBSCRIPTIONS,
+        ),
+        batch_size,
+    )
+
+    for field in counters.COUNTERS:
+        counters.reconcile(field)
+    call_command("rebuild_search_index", stdout=io.StringIO())
+    # Generated users only relate to each other, so only their totals and
+    # feeds are added.
+    yield "shopping cart totals", insert_from(
+        ShoppingCartTotal,
+        ("user", "ingredient", "amount"),
+        ShoppingCart.objects.filter(
+            user_id__gt=last_user_id,
+            recipe__ingredients_in_recipe__isnull=False,
+        )
+        .values_list("user_id", "recipe__ingredients_in_recipe__ingredient_id")
+        .annotate(amount=Sum("recipe__ingredients_in_recipe__amount"))
+        .order_by(),
+    )
+    latest_recipe_ids = (
+        Recipe.objects.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("author_id"),
+                order_by=(F("created").desc(), F("id").desc()),
+            )
+        )
+        .filter(position__lte=FEED_BACKFILL_SIZE)
+        .values("id")
+    )
+    yield "feed entries", insert_from(
+        FeedEntry,
+        ("user", "author", "recipe", "created"),
+        Recipe.objects.filter(
+            id__in=latest_recipe_ids,
+            author__subscribers_count__lte=FEED_FAN_OUT_MAX_FOLLOWERS,
+            author__subscriptions_where_author__subscriber_id__gt=(
+                last_user_id
+            ),
+        )
+        .values_list(
+            "author__subscriptions_where_author__subscriber_id",
+            "author_id",
+            "id",
+            "created",
+        )
+        .order_by(),
+    )
+    inverted_index.invalidate()
+    versions.bump(
+        versions.RECIPES,
+        versions.USERS,
+        versions.RECIPE_INGREDIENTS,
+        versions.FAVORITES,
+    )
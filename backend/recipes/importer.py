@@ -0,0 +1,142 @@
+"""Bulk import of recipes from NDJSON, one recipe object per line.
+
+Rows are validated a batch at a time, checking the ingredients of the
+whole batch with one query, and valid rows are inserted with
+``bulk_create`` in a transaction per batch. ``bulk_create`` skips the
+signals, so what they do for a single recipe is done here per batch.
+Invalid rows, and rows of a batch failing to insert, are reported with
+their line numbers; the other rows are imported anyway.
+"""
+import json
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from api import versions
+from blobs import references
+from foodgram import images
+from foodgram.constants import IMPORT_BATCH_SIZE
+from recipes import counters, feed, inverted_index
+from recipes.models import Ingredient, IngredientInRecipe, Recipe
+from recipes.serializers import ImportRecipeSerializer
+
+
+def get_error(line, message):
+    return {"line": line, "errors": {"non_field_errors": [message]}}
+
+
+def validate(rows):
+    """Split (line, text) rows into valid (line, data) rows and errors."""
+    valid, errors = [], []
+    for line, text in rows:
+        try:
+            data = json.loads(text)
+        except ValueError:
+            errors.append(get_error(line, "Строка не является JSON."))
+            continue
+        serializer = ImportRecipeSerializer(data=data)
+        if serializer.is_valid():
+            valid.append((line, serializer.validated_data))
+        else:
+            errors.append({"line": line, "errors": serializer.errors})
+
+    known_ids = set(
+        Ingredient.objects.filter(
+            id__in={
+                element["id"]
+                for _, data in valid
+                for element in data["ingredients"]
+            }
+        ).values_list("id", flat=True)
+    )
+    rows = []
+    for line, data in valid:
+        unknown_ids = [
+            element["id"]
+            for element in data["ingredients"]
+            if element["id"] not in known_ids
+        ]
+        if unknown_ids:
+            errors.append(
+                {
+                    "line": line,
+                    "errors": {
+                        "ingredients": [
+                            f"Ингредиента с id {id} не существует."
+                            for id in unknown_ids
+                        ]
+                    },
+                }
+            )
+        else:
+            rows.append((line, data))
+
+    return rows, errors
+
+
+@transaction.atomic
+def create(author, rows):
+    """Insert validated rows of the author, return the new recipes."""
+    recipes = []
+    for data in rows:
+        recipe = Recipe(
+            author=author,
+            name=data["name"],
+            text=data["text"],
+            cooking_time=data["cooking_time"],
+        )
+        image = data.get("image")
+        if image is not None:
+            recipe.image.save(image.name, image, save=False)
+        recipes.append(recipe)
+    Recipe.objects.bulk_create(recipes)
+    IngredientInRecipe.objects.bulk_create(
+        IngredientInRecipe(
+            recipe=recipe,
+            ingredient_id=element["id"],
+            amount=element["amount"],
+        )
+        for recipe, data in zip(recipes, rows)
+        for element in data["ingredients"]
+    )
+
+    inverted_index.set_recipes(
+        {
+            recipe.id: [element["id"] for element in data["ingredients"]]
+            for recipe, data in zip(recipes, rows)
+        }
+    )
+    counters.add("recipes_count", author.id, len(recipes))
+    feed.fan_out_later(author.id, [recipe.id for recipe in recipes])
+    with_images = [recipe for recipe in recipes if recipe.image]
+    references.acquire_many(recipe.image.name for recipe in with_images)
+    images.refresh_many_later(with_images, "image")
+    versions.bump(versions.RECIPES)
+
+    return recipes
+
+
+def import_lines(lines, author, batch_size=IMPORT_BATCH_SIZE):
+    """Import NDJSON lines as recipes of the author.
+
+    Return {"created": <number of recipes>, "errors": [{"line": <number>,
+    "errors": <serializer errors>}]}.
+    """
+    created, errors = 0, []
+    rows = (
+        (line, text)
+        for line, text in enumerate(lines, start=1)
+        if text.strip()
+    )
+    while batch := list(islice(rows, batch_size)):
+        valid, batch_errors = validate(batch)
+        errors.extend(batch_errors)
+        if not valid:
+            continue
+        try:
+            created += len(create(author, [data for _, data in valid]))
+        except DatabaseError as error:
+            errors.extend(get_error(line, str(error)) for line, _ in valid)
+
+    errors.sort(key=lambda error: error["line"])
+    return {"created": created, "errors": errors}
@@ -0,0 +1,184 @@
+"""In-process inverted index: ingredient id -> sorted recipe ids.
+
+Used to rank recipes by the share of their ingredients in a set without
+counting IngredientInRecipe rows per recipe in SQL. The index is updated
+in place by the process that changes a recipe. Other processes notice
+the moved version and rebuild it from the whole IngredientInRecipe
+table, at most once per ``RECIPE_INGREDIENTS_INDEX_MAX_AGE`` seconds:
+with many workers and frequent edits every worker rebuilds that often,
+and rankings of recipes changed elsewhere lag as long. Which recipes
+match is always read from the database, see recipes.filters. Noticing
+moves across processes needs a shared cache.
+"""
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain
+
+from django.db import transaction
+
+from api import versions
+from foodgram.constants import RECIPE_INGREDIENTS_INDEX_MAX_AGE
+from recipes.models import IngredientInRecipe
+
+EMPTY = array("q")
+
+
+def contains(postings, recipe_id):
+    position = bisect_left(postings, recipe_id)
+    return position < len(postings) and postings[position] == recipe_id
+
+
+class RecipeIngredientIndex:
+    current = None
+    current_version = None
+    built = 0.0
+
+    def __init__(self, pairs):
+        recipes = {}
+        for recipe_id, ingredient_id in pairs:
+            recipes.setdefault(recipe_id, []).append(ingredient_id)
+
+        postings = {}
+        for recipe_id in sorted(recipes):
+            for ingredient_id in recipes[recipe_id]:
+                postings.setdefault(ingredient_id, array("q")).append(
+                    recipe_id
+                )
+
+        self.postings = postings
+        self.recipes = {
+            recipe_id: tuple(ingredient_ids)
+            for recipe_id, ingredient_ids in recipes.items()
+        }
+
+    def set_recipe(self, recipe_id, ingredient_ids):
+        self.remove_recipe(recipe_id)
+        for ingredient_id in ingredient_ids:
+            insort(
+                self.postings.setdefault(ingredient_id, array("q")), recipe_id
+            )
+        self.recipes[recipe_id] = tuple(ingredient_ids)
+
+    def remove_recipe(self, recipe_id):
+        for ingredient_id in self.recipes.pop(recipe_id, ()):
+            postings = self.postings[ingredient_id]
+            del postings[bisect_left(postings, recipe_id)]
+
+    def match(self, ingredient_ids, match_all):
+        """Return {recipe id: coverage} of the matching recipes.
+
+        Coverage is the share of the recipe's ingredients that are in
+        the requested set.
+        """
+        postings = sorted(
+            (self.postings.get(id, EMPTY) for id in set(ingredient_ids)),
+            key=len,
+        )
+        if not postings:
+            return {}
+
+        if match_all:
+            shortest, *rest = postings
+            counts = {
+                recipe_id: len(postings)
+                for recipe_id in shortest
+                if all(contains(other, recipe_id) for other in rest)
+            }
+        else:
+            counts = Counter(chain.from_iterable(postings))
+
+        return {
+            recipe_id: count / len(self.recipes[recipe_id])
+            for recipe_id, count in counts.items()
+        }
+
+
+def get_index():
+    version, = versions.get_versions(versions.RECIPE_INGREDIENTS)
+    current_version = RecipeIngredientIndex.current_version
+    if current_version != version and (
+        current_version is None
+        or time.monotonic() - RecipeIngredientIndex.built
+        >= RECIPE_INGREDIENTS_INDEX_MAX_AGE
+    ):
+        RecipeIngredientIndex.current = RecipeIngredientIndex(
+            IngredientInRecipe.objects.order_by().values_list(
+                "recipe_id", "ingredient_id"
+            )
+        )
+        RecipeIngredientIndex.current_version = version
+        RecipeIngredientIndex.built = time.monotonic()
+
+    return RecipeIngredientIndex.current
+
+
+def apply(change):
+    """Apply change(index) locally and move the version for others.
+
+    The local copy is only patched if the atomic increment shows that no
+    other process changed the index since the version was read, else it
+    is rebuilt on the next lookup.
+    """
+    version, = versions.get_versions(versions.RECIPE_INGREDIENTS)
+    new_version = versions.increment(versions.RECIPE_INGREDIENTS)
+
+    index = RecipeIngredientIndex.current
+    if (
+        new_version == version + 1
+        and index is not None
+        and RecipeIngredientIndex.current_version == version
+    ):
+        change(index)
+        RecipeIngredientIndex.current_version = new_version
+    else:
+        RecipeIngredientIndex.current_version = None
+
+
+def set_recipe(recipe_id, ingredient_ids):
+    set_recipes({recipe_id: ingredient_ids})
+
+
+def set_recipes(recipe_ingredient_ids):
+    """Index {recipe id: ingredient ids} with one version move."""
+    recipe_ingredient_ids = {
+        recipe_id: tuple(ingredient_ids)
+        for recipe_id, ingredient_ids in recipe_ingredient_ids.items()
+    }
+
+    def change(index):
+        for recipe_id, ingredient_ids in recipe_ingredient_ids.items():
+            index.set_recipe(recipe_id, ingredient_ids)
+
+    transaction.on_commit(lambda: apply(change))
+
+
+def reindex_recipe(recipe_id):
+    """Re-read the recipe's ingredients, for edits made outside the API."""
+    set_recipe(
+        recipe_id,
+        IngredientInRecipe.objects.filter(recipe_id=recipe_id)
+        .order_by()
+        .values_list("ingredient_id", flat=True),
+    )
+
+
+def remove_recipe(recipe_id):
+    transaction.on_commit(
+        lambda: apply(lambda index: index.remove_recipe(recipe_id))
+    )
+
+
+def invalidate():
+    """Rebuild the index here at once, elsewhere within the max age."""
+
+    def touch():
+        versions.touch(versions.RECIPE_INGREDIENTS)
+        RecipeIngredientIndex.current_version = None
+
+    transaction.on_commit(touch)
+
+
+def match(ingredient_ids, match_all):
+    return get_index().match(ingredient_ids, match_all)
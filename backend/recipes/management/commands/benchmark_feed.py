@@ -0,0 +1,88 @@
+import statistics
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import FeedCursorPagination
+from recipes import feed
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare feed strategies by paging through the feeds of the users "
+        "following the most authors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--pages", type=int, default=5)
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        users = list(
+            User.objects.annotate(
+                following=Count("subscriptions_where_subscriber")
+            )
+            .filter(following__gt=0)
+            .order_by("-following")[:options["users"]]
+        )
+        if not users:
+            self.stdout.write("No subscriptions to benchmark.")
+            return
+
+        pages = {}
+        for strategy in feed.STRATEGIES:
+            timings, queries, pages[strategy] = self.run(
+                strategy, users, options["pages"], options["limit"]
+            )
+            self.stdout.write(
+                f"{strategy:>8}: "
+                f"median {statistics.median(timings) * 1000:.2f} ms, "
+                f"max {max(timings) * 1000:.2f} ms, "
+                f"{queries / len(timings):.1f} queries per page"
+            )
+
+        if len({tuple(result) for result in pages.values()}) > 1:
+            # Fanned-out feeds only hold FEED_BACKFILL_SIZE older recipes
+            # per author followed, so deep pages may legitimately differ.
+            self.stderr.write("Strategies returned different feeds.")
+
+    def run(self, strategy, users, page_count, limit):
+        """Page through every user's feed, timing each page."""
+        factory = APIRequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        timings = []
+        queries = 0
+        recipe_ids = []
+        for user in users:
+            params = {"limit": limit} if limit else {}
+            for _ in range(page_count):
+                request = Request(factory.get("/api/recipes/feed/", params))
+                paginator = FeedCursorPagination()
+                with CaptureQueriesContext(connection) as context:
+                    start = perf_counter()
+                    rows = paginator.paginate_queryset(
+                        feed.get_feed(user, strategy), request
+                    )
+                    timings.append(perf_counter() - start)
+                queries += len(context.captured_queries)
+                recipe_ids.extend(row["recipe_id"] for row in rows)
+
+                next_link = paginator.get_next_link()
+                if next_link is None:
+                    break
+                params = {
+                    name: values[0]
+                    for name, values in parse_qs(
+                        urlparse(next_link).query
+                    ).items()
+                }
+
+        return timings, queries, recipe_ids
@@ -0,0 +1,56 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.constants import GENERATE_BATCH_SIZE, GENERATE_ZIPF_EXPONENT
+from recipes import generator
+from recipes.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate users, recipes and their relations with Zipf "
+        "distributed popularity, on top of the loaded ingredients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--recipes", type=int, default=300000)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--favorites", type=int, default=3000000)
+        parser.add_argument("--carts", type=int, default=500000)
+        parser.add_argument("--subscriptions", type=int, default=1000000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--exponent",
+            type=float,
+            default=GENERATE_ZIPF_EXPONENT,
+            help="Zipf exponent, higher concentrates on fewer popular rows.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=GENERATE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if not Ingredient.objects.exists():
+            raise CommandError(
+                "No ingredients, load initial_data.json first."
+            )
+
+        started = perf_counter()
+        for stage, count in generator.generate(
+            users=options["users"],
+            recipes=options["recipes"],
+            ingredients_per_recipe=options["ingredients_per_recipe"],
+            favorites=options["favorites"],
+            carts=options["carts"],
+            subscriptions=options["subscriptions"],
+            seed=options["seed"],
+            exponent=options["exponent"],
+            batch_size=options["batch_size"],
+        ):
+            self.stdout.write(
+                f"{stage}: {count} rows ({perf_counter() - started:.0f} s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Data generated."))
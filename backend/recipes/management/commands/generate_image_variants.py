@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from api import versions
+from foodgram import images
+from recipes.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Create missing or outdated resized variants of uploaded images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that are up to date too.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, field_name in ((Recipe, "image"), (User, "avatar")):
+            refreshed = 0
+            fields = [field_name, f"{field_name}_variants"]
+            if hasattr(model, f"{field_name}_status"):
+                fields.append(f"{field_name}_status")
+            objects = model.objects.only("pk", *fields).order_by("pk")
+            for instance in objects.iterator():
+                if options["force"] or not images.is_current(
+                    instance, field_name
+                ):
+                    images.refresh(instance, field_name, force=True)
+                    refreshed += 1
+            total += refreshed
+
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {refreshed} refreshed"
+            )
+
+        if total:
+            # Representations are built from the variants, revalidate them.
+            versions.bump(versions.RECIPES, versions.USERS)
+
+        self.stdout.write(self.style.SUCCESS("Image variants are up to date."))
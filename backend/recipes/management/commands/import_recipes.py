@@ -0,0 +1,54 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.constants import IMPORT_BATCH_SIZE
+from recipes import importer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Import recipes from an NDJSON file, one recipe per line."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='NDJSON file, "-" for stdin.')
+        parser.add_argument(
+            "--author",
+            required=True,
+            help="Email of the author of the imported recipes.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Rows validated and inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(email=options["author"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['author']}.")
+
+        if options["path"] == "-":
+            report = importer.import_lines(
+                sys.stdin, author, options["batch_size"]
+            )
+        else:
+            with open(options["path"], encoding="utf-8") as file:
+                report = importer.import_lines(
+                    file, author, options["batch_size"]
+                )
+
+        for error in report["errors"]:
+            self.stderr.write(
+                f"Line {error['line']}: "
+                + json.dumps(error["errors"], ensure_ascii=False)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} recipes imported, "
+                f"{len(report['errors'])} rows failed."
+            )
+        )
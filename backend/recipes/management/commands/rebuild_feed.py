@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recipes import feed
+from recipes.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = "Recreate the fanned-out recipe feeds from the subscriptions."
+
+    def handle(self, *args, **options):
+        feed.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Feeds rebuilt ({FeedEntry.objects.count()} entries)."
+            )
+        )
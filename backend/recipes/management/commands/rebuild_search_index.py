@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from recipes.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Recreate the recipe full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with connection.schema_editor() as schema_editor:
+            backend.install(schema_editor)
+        with connection.cursor() as cursor:
+            backend.rebuild(cursor)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search index rebuilt ({type(backend).__name__})."
+            )
+        )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes import cart_totals
+from recipes.models import ShoppingCart, ShoppingCartTotal
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized shopping cart totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare stored totals with the carts without changing them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            self.verify()
+            return
+
+        user_ids = set(
+            ShoppingCart.objects.values_list("user_id", flat=True)
+        ) | set(ShoppingCartTotal.objects.values_list("user_id", flat=True))
+        cart_totals.refresh_users(user_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Shopping cart totals rebuilt for {len(user_ids)} users."
+            )
+        )
+
+    def verify(self):
+        expected = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount in cart_totals.compute_totals()
+        }
+        stored = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount in (
+                ShoppingCartTotal.objects.order_by().values_list(
+                    "user_id", "ingredient_id", "amount"
+                )
+            )
+        }
+
+        mismatches = sorted(
+            key
+            for key in expected.keys() | stored.keys()
+            if expected.get(key) != stored.get(key)
+        )
+        for user_id, ingredient_id in mismatches:
+            self.stderr.write(
+                f"user {user_id}, ingredient {ingredient_id}: "
+                f"stored {stored.get((user_id, ingredient_id))}, "
+                f"expected {expected.get((user_id, ingredient_id))}"
+            )
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} shopping cart totals are out of date."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Shopping cart totals match."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from recipes import counters
+
+
+class Command(BaseCommand):
+    help = "Recount denormalized counters that drifted from the relations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted counters without fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        for field in counters.COUNTERS:
+            drifted = counters.reconcile(field, dry_run=options["dry_run"])
+            self.stdout.write(f"{field}: {drifted} drifted")
+
+        self.stdout.write(self.style.SUCCESS("Counters reconciled."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+def copy_created_to_updated(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Recipe.objects.update(updated=models.F("created"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="updated",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Дата изменения рецепта"
+            ),
+        ),
+        migrations.RunPython(
+            copy_created_to_updated, migrations.RunPython.noop
+        ),
+    ]
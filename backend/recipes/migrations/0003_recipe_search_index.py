@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from recipes.search import get_backend
+
+    get_backend(schema_editor.connection.vendor).install(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0002_recipe_updated"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            install_search_index, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+FEED_BACKFILL_SIZE = 100
+
+
+def populate_feeds(apps, schema_editor):
+    """Backfill every subscriber's feed with the authors' latest recipes.
+
+    Follower limits are left to the first rebuild_feed run.
+    """
+    Subscription = apps.get_model("users", "Subscription")
+    Recipe = apps.get_model("recipes", "Recipe")
+    FeedEntry = apps.get_model("recipes", "FeedEntry")
+    for subscriber_id, author_id in list(
+        Subscription.objects.values_list("subscriber_id", "author_id")
+    ):
+        FeedEntry.objects.bulk_create(
+            FeedEntry(
+                user_id=subscriber_id,
+                author_id=author_id,
+                recipe_id=recipe_id,
+                created=created,
+            )
+            for recipe_id, created in Recipe.objects.filter(
+                author_id=author_id
+            )
+            .order_by("-created", "-id")
+            .values_list("id", "created")[:FEED_BACKFILL_SIZE]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0004_shoppingcarttotal"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        verbose_name="Дата публикации рецепта"
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        to="recipes.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Подписчик",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запись ленты",
+                "verbose_name_plural": "Записи лент",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created", "-recipe"],
+                        name="recipes_feed_user_created_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "author"],
+                        name="recipes_feed_user_author_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "recipe"),
+                        name="unique_user_recipe_feedentry",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0007_recipe_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Обрабатывается"),
+                    ("ready", "Готово"),
+                    ("failed", "Ошибка"),
+                ],
+                default="ready",
+                editable=False,
+                max_length=16,
+                verbose_name="Обработка изображения",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+import blobs.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0008_recipe_image_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="recipe",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                storage=blobs.storage.get_storage,
+                upload_to="recipes/",
+                verbose_name="Фотография рецепта",
+            ),
+        ),
+    ]
@@ -1,13 +1,17 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connections, models
+from django.db.models.functions import RowNumber
 
-from foodgram.constants import (INGREDIENT_MEASUREMENT_UNIT_MAX_LENGTH,
+from blobs.storage import get_storage
+from foodgram.constants import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_READY,
+                                INGREDIENT_MEASUREMENT_UNIT_MAX_LENGTH,
                                 INGREDIENT_MIN_AMOUNT_IN_RECIPE,
                                 INGREDIENT_NAME_MAX_LENGTH,
                                 RECIPE_IMAGE_UPLOAD_TO,
                                 RECIPE_MIN_COOKING_TIME,
-                                RECIPE_NAME_MAX_LENGTH)
+                                RECIPE_NAME_MAX_LENGTH, SHORT_LINK_CODE_LENGTH)
+from foodgram.models import CounterFieldsMixin
 
 User = get_user_model()
 
@@ -71,7 +75,68 @@ class IngredientInRecipe(models.Model):
         return f"{self.ingredient} {self.recipe}"
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self):
+        """Load author and ingredients along with the recipes."""
+        return self.select_related("author").prefetch_related(
+            models.Prefetch(
+                "ingredients_in_recipe",
+                queryset=IngredientInRecipe.objects.select_related(
+                    "ingredient"
+                ).order_by("pk"),
+            )
+        )
+
+    def with_user_flags(self, user):
+        """Annotate is_favorited and is_in_shopping_cart for the user."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(False),
+                is_in_shopping_cart=models.Value(False),
+            )
+
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorite.objects.filter(
+                    user=user, recipe=models.OuterRef("pk")
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=models.OuterRef("pk")
+                )
+            ),
+        )
+
+    def latest_by_author(self, author_ids, limit=None):
+        """Return the newest recipes of the authors, up to limit each.
+
+        The limit is applied with ROW_NUMBER() in a single query. Callers
+        must still cut each author's list at limit for databases without
+        window functions, where every recipe of the authors is returned.
+        """
+        queryset = self.filter(author_id__in=author_ids).order_by(
+            "author_id", "-created", "-id"
+        )
+        features = connections[self.db].features
+        if limit is None or not features.supports_over_clause:
+            return queryset
+
+        return queryset.annotate(
+            author_position=models.Window(
+                RowNumber(),
+                partition_by="author_id",
+                order_by=("-created", "-id"),
+            )
+        ).filter(author_position__lte=limit)
+
+
+class Recipe(CounterFieldsMixin, models.Model):
+
+    # Moved by F() updates only, see recipes.counters.
+    COUNTER_FIELDS = ("favorites_count",)
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -83,6 +148,7 @@ class Recipe(models.Model):
     image = models.ImageField(
         verbose_name="Фотография рецепта",
         upload_to=RECIPE_IMAGE_UPLOAD_TO,
+        storage=get_storage,
         blank=True,
     )
     text = models.TextField(verbose_name="Описание рецепта")
@@ -102,6 +168,33 @@ class Recipe(models.Model):
         db_index=True,
         verbose_name="Дата публикации рецепта",
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения рецепта",
+    )
+    image_variants = models.JSONField(
+        verbose_name="Уменьшенные копии изображения",
+        default=dict,
+        editable=False,
+    )
+    image_status = models.CharField(
+        verbose_name="Обработка изображения",
+        max_length=16,
+        choices=(
+            (IMAGE_PENDING, "Обрабатывается"),
+            (IMAGE_READY, "Готово"),
+            (IMAGE_FAILED, "Ошибка"),
+        ),
+        default=IMAGE_READY,
+        editable=False,
+    )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name="Количество добавлений в избранное",
+        default=0,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Рецепт"
@@ -113,6 +206,29 @@ class Recipe(models.Model):
         return self.name
 
 
+class ShortLink(models.Model):
+    """Short code of a recipe link, see recipes.short_links."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="short_link",
+        verbose_name="Рецепт",
+    )
+    code = models.CharField(
+        max_length=SHORT_LINK_CODE_LENGTH,
+        unique=True,
+        verbose_name="Код",
+    )
+
+    class Meta:
+        verbose_name = "Короткая ссылка"
+        verbose_name_plural = "Короткие ссылки"
+
+    def __str__(self):
+        return self.code
+
+
 class UserRecipeRelation(models.Model):
     user = models.ForeignKey(
         User,
@@ -152,3 +268,78 @@ class ShoppingCart(UserRecipeRelation):
         verbose_name = "Список покупок"
         verbose_name_plural = "Списки покупок"
         default_related_name = "shopping_carts"
+
+
+class ShoppingCartTotal(models.Model):
+    """Materialized sum of ingredient amounts over a user's cart."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name="Ингредиент",
+    )
+    amount = models.PositiveIntegerField(verbose_name="Количество")
+
+    class Meta:
+        verbose_name = "Итог списка покупок"
+        verbose_name_plural = "Итоги списков покупок"
+        default_related_name = "shopping_cart_totals"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"],
+                name="unique_user_ingredient_shopping_cart_total",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.ingredient} {self.amount}"
+
+
+class FeedEntry(models.Model):
+    """Recipe fanned out into the feed of one of its author's followers."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name="Подписчик",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name="Рецепт",
+    )
+    created = models.DateTimeField(verbose_name="Дата публикации рецепта")
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи лент"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_user_recipe_feedentry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-recipe"],
+                name="recipes_feed_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "author"], name="recipes_feed_user_author_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.recipe}"
@@ -0,0 +1,122 @@
+"""Batch changes of favorites and shopping carts of a user.
+
+Rows are added with one ``bulk_create`` and removed with one
+``DELETE``, both skipping the per-row signals, so the counters are moved
+with one ``F()`` update per counter and the user's cart totals are
+recomputed instead. Like the signals' increments, these commute with
+concurrent single recipe requests. Removed rows are locked first, so
+concurrent removals never decrement twice.
+
+``ignore_conflicts`` makes a concurrent add of the same recipe by the
+same user count twice; ``reconcile_counters`` repairs such drift.
+"""
+from django.db import connections, transaction
+
+from api import versions
+from recipes import cart_totals, counters
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+ADDED = "added"
+REMOVED = "removed"
+ALREADY_ADDED = "already_added"
+NOT_ADDED = "not_added"
+NOT_FOUND = "not_found"
+
+
+def record_favorites(user, recipe_ids, delta):
+    counters.add_many("favorites_count", recipe_ids, delta)
+    versions.bump(versions.get_viewer_name(user.id), versions.FAVORITES)
+
+
+def record_shopping_cart(user, recipe_ids, delta):
+    counters.add("shopping_cart_count", user.id, delta * len(recipe_ids))
+    cart_totals.refresh_users([user.id])
+    versions.bump(versions.get_viewer_name(user.id))
+
+
+# What the signals would do for the added (1) or removed (-1) rows.
+RECORD = {
+    Favorite: record_favorites,
+    ShoppingCart: record_shopping_cart,
+}
+
+
+def get_results(recipe_ids, statuses):
+    return [
+        {"id": recipe_id, "status": statuses.get(recipe_id, NOT_FOUND)}
+        for recipe_id in recipe_ids
+    ]
+
+
+@transaction.atomic
+def add(model, user, recipe_ids):
+    """Add recipes to the user's favorites or cart, return id statuses."""
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    found_ids = Recipe.objects.filter(pk__in=recipe_ids).values_list(
+        "pk", flat=True
+    )
+    statuses = dict.fromkeys(found_ids, ADDED)
+    statuses.update(
+        dict.fromkeys(
+            model.objects.filter(
+                user=user, recipe_id__in=statuses
+            ).values_list("recipe_id", flat=True),
+            ALREADY_ADDED,
+        )
+    )
+    added_ids = [
+        recipe_id
+        for recipe_id, status in statuses.items()
+        if status == ADDED
+    ]
+    if added_ids:
+        model.objects.bulk_create(
+            [model(user=user, recipe_id=recipe_id) for recipe_id in added_ids],
+            ignore_conflicts=True,
+        )
+        RECORD[model](user, added_ids, 1)
+
+    return get_results(recipe_ids, statuses)
+
+
+@transaction.atomic
+def remove(model, user, recipe_ids):
+    """Remove recipes from the user's favorites or cart."""
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    statuses = dict.fromkeys(
+        Recipe.objects.filter(pk__in=recipe_ids).values_list(
+            "pk", flat=True
+        ),
+        NOT_ADDED,
+    )
+    removed_ids = list(
+        model.objects.select_for_update()
+        .filter(user=user, recipe_id__in=statuses)
+        .order_by()
+        .values_list("recipe_id", flat=True)
+    )
+    if removed_ids:
+        statuses.update(dict.fromkeys(removed_ids, REMOVED))
+        delete_rows(model, user, removed_ids)
+        RECORD[model](user, removed_ids, -1)
+
+    return get_results(recipe_ids, statuses)
+
+
+def delete_rows(model, user, recipe_ids):
+    """Delete the user's rows in one statement, without per-row signals."""
+    connection = connections[model.objects.db]
+    table, user_column, recipe_column = (
+        connection.ops.quote_name(name)
+        for name in (
+            model._meta.db_table,
+            model._meta.get_field("user").column,
+            model._meta.get_field("recipe").column,
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {user_column} = %s AND "
+            f"{recipe_column} IN ({', '.join(['%s'] * len(recipe_ids))})",
+            [user.id, *recipe_ids],
+        )
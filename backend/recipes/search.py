@@ -0,0 +1,153 @@
+"""Full-text recipe search backends.
+
+The backend is picked by database vendor, or set explicitly with the
+``RECIPE_SEARCH_BACKEND`` setting (dotted path to a backend class).
+Indexes are maintained by the database itself: a generated ``tsvector``
+column on Postgres and trigger-synced FTS5 table on SQLite, so they
+stay in sync on every recipe save.
+"""
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from foodgram.constants import RECIPE_SEARCH_CONFIG
+
+
+class SimpleSearchBackend:
+    """Fallback for databases without a supported full-text index."""
+
+    def install(self, schema_editor):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            models.Q(name__icontains=query) | models.Q(text__icontains=query)
+        )
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    """Weighted tsvector column with a GIN index."""
+
+    def install(self, schema_editor):
+        config = f"'{RECIPE_SEARCH_CONFIG}'"
+        schema_editor.execute(
+            "ALTER TABLE recipes_recipe "
+            "ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector({config}, coalesce(name, '')), 'A') || "
+            f"setweight(to_tsvector({config}, coalesce(text, '')), 'B')"
+            ") STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_idx "
+            "ON recipes_recipe USING GIN (search_vector)"
+        )
+
+    def search(self, queryset, query):
+        tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+        params = (RECIPE_SEARCH_CONFIG, query)
+
+        return queryset.filter(
+            RawSQL(
+                f"recipes_recipe.search_vector @@ {tsquery}",
+                params,
+                output_field=models.BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank(recipes_recipe.search_vector, {tsquery})", params
+            )
+        ).order_by("-search_rank", "-created")
+
+
+class SqliteSearchBackend(SimpleSearchBackend):
+    """FTS5 external content table synced by triggers."""
+
+    table = "recipes_recipe_fts"
+    triggers = {
+        "recipes_recipe_fts_insert": (
+            "AFTER INSERT ON recipes_recipe BEGIN "
+            "INSERT INTO recipes_recipe_fts(rowid, name, text) "
+            "VALUES (new.id, new.name, new.text); END"
+        ),
+        "recipes_recipe_fts_delete": (
+            "AFTER DELETE ON recipes_recipe BEGIN "
+            "INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, "
+            "text) VALUES ('delete', old.id, old.name, old.text); END"
+        ),
+        "recipes_recipe_fts_update": (
+            "AFTER UPDATE OF name, text ON recipes_recipe BEGIN "
+            "INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, "
+            "text) VALUES ('delete', old.id, old.name, old.text); "
+            "INSERT INTO recipes_recipe_fts(rowid, name, text) "
+            "VALUES (new.id, new.name, new.text); END"
+        ),
+    }
+
+    def install(self, schema_editor):
+        """Create the index, restoring triggers lost on table rebuilds."""
+        created = self.table not in (
+            schema_editor.connection.introspection.table_names()
+        )
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            "name, text, content='recipes_recipe', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name, definition in self.triggers.items():
+            schema_editor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {definition}"
+            )
+        if created:
+            with schema_editor.connection.cursor() as cursor:
+                self.rebuild(cursor)
+
+    def rebuild(self, cursor):
+        cursor.execute(
+            f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')"
+        )
+
+    def search(self, queryset, query):
+        match = self.to_match_expression(query)
+        if not match:
+            return queryset
+
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {self.table} "
+                f"WHERE {self.table} MATCH %s",
+                (match,),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({self.table}, 10.0, 1.0) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s "
+                f"AND {self.table}.rowid = recipes_recipe.id",
+                (match,),
+            )
+        ).order_by("-search_rank", "-created")
+
+    @staticmethod
+    def to_match_expression(query):
+        """Quote every word as a prefix term, so input cannot break syntax."""
+        return " ".join(
+            '"{}"*'.format(word.replace('"', '""')) for word in query.split()
+        )
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    backend_path = getattr(settings, "RECIPE_SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+
+    return BACKENDS.get(vendor or connection.vendor, SimpleSearchBackend)()
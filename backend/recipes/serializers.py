@@ -1,10 +1,14 @@
+from django.db import models, transaction
 from rest_framework import serializers
 
-from api.fields import Bit64ImageField
+from api.fields import Bit64ImageField, ImageVariantsField
 from api.serializers import UserProfileSerializer
-from foodgram.constants import INGREDIENT_MIN_AMOUNT_IN_RECIPE
+from foodgram.constants import (INGREDIENT_MIN_AMOUNT_IN_RECIPE,
+                                RELATION_BATCH_MAX_SIZE)
+from recipes import cache as recipe_cache
+from recipes import cart_totals, inverted_index
 from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
-                            ShoppingCart)
+                            ShoppingCart, ShoppingCartTotal)
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -32,6 +36,34 @@ class ShortIngredientsSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit")
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """Read and write the cached parts of a page in one round trip each."""
+
+    def to_representation(self, data):
+        recipes = (
+            data.all() if isinstance(data, models.manager.BaseManager)
+            else data
+        )
+        cached = recipe_cache.get_representations(recipes)
+        representations = []
+        missed = {}
+        for recipe in recipes:
+            if recipe.id in cached:
+                representations.append(
+                    self.child.overlay(cached[recipe.id], recipe)
+                )
+                continue
+            representation = self.child.serialize(recipe)
+            representations.append(representation)
+            missed[recipe] = self.child.get_shared_representation(
+                representation, recipe
+            )
+        if missed:
+            recipe_cache.set_representations(missed)
+
+        return representations
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     author = UserProfileSerializer()
     ingredients = IngredientSerializer(
@@ -39,6 +71,9 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    favorites_count = serializers.ReadOnlyField()
+    image_variants = ImageVariantsField()
+    image_status = serializers.ReadOnlyField()
 
     class Meta:
         model = Recipe
@@ -48,28 +83,98 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients",
             "is_favorited",
             "is_in_shopping_cart",
+            "favorites_count",
             "name",
             "image",
+            "image_variants",
+            "image_status",
             "text",
             "cooking_time",
         )
+        list_serializer_class = RecipeListSerializer
 
-    def get_is_favorited(self, obj):
-        request = self.context.get("request")
+    def to_representation(self, instance):
+        data = recipe_cache.get_representation(instance)
+        if data is not None:
+            return self.overlay(data, instance)
 
-        return (
-            request is not None
-            and request.user.is_authenticated
-            and request.user.favorites.filter(pk=obj.id).exists()
+        data = self.serialize(instance)
+        recipe_cache.set_representation(
+            instance, self.get_shared_representation(data, instance)
         )
+        return data
+
+    def serialize(self, instance):
+        """Build the full representation, bypassing the cache."""
+        return super().to_representation(instance)
+
+    def overlay(self, data, instance):
+        """Overlay viewer flags and counters on the cached shared part."""
+        author_fields = self.fields["author"].fields
+        data["image"] = self.build_url(data["image"])
+        data["image_variants"] = self.fields[
+            "image_variants"
+        ].to_representation(instance.image_variants)
+        data["image_status"] = instance.image_status
+        data["author"]["avatar"] = self.build_url(data["author"]["avatar"])
+        data["author"]["avatar_variants"] = author_fields[
+            "avatar_variants"
+        ].to_representation(instance.author.avatar_variants)
+        data["author"]["is_subscribed"] = self.fields[
+            "author"
+        ].get_is_subscribed(instance.author)
+        data["is_favorited"] = self.get_is_favorited(instance)
+        data["is_in_shopping_cart"] = self.get_is_in_shopping_cart(instance)
+        data["favorites_count"] = instance.favorites_count
+
+        return data
+
+    @staticmethod
+    def get_shared_representation(data, instance):
+        """Strip viewer flags, counters and request host."""
+        author = instance.author
+
+        return {
+            **data,
+            "author": {
+                **data["author"],
+                "is_subscribed": None,
+                "avatar": author.avatar.url if author.avatar else None,
+                "avatar_variants": None,
+            },
+            "is_favorited": None,
+            "is_in_shopping_cart": None,
+            "favorites_count": None,
+            "image": instance.image.url if instance.image else None,
+            "image_variants": None,
+            "image_status": None,
+        }
+
+    def build_url(self, url):
+        request = self.context.get("request")
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_is_favorited(self, obj):
+        return self.get_user_flag(obj, "is_favorited", "favorites")
 
     def get_is_in_shopping_cart(self, obj):
+        return self.get_user_flag(obj, "is_in_shopping_cart", "shopping_carts")
+
+    def get_user_flag(self, obj, annotation, related_name):
+        """Prefer the queryset annotation, query only for bare instances."""
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
+
         request = self.context.get("request")
 
         return (
             request is not None
             and request.user.is_authenticated
-            and request.user.shopping_carts.filter(pk=obj.id).exists()
+            and getattr(request.user, related_name)
+            .filter(recipe=obj.id)
+            .exists()
         )
 
 
@@ -81,16 +186,6 @@ class CreateShortIngredientsSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = ("id", "amount")
 
-    def validate_id(self, id):
-        try:
-            Ingredient.objects.get(id=id)
-        except Ingredient.DoesNotExist:
-            raise serializers.ValidationError(
-                f"Ингредиента с id {id} не существует."
-            )
-
-        return id
-
     def validate_amount(self, value):
         if value < INGREDIENT_MIN_AMOUNT_IN_RECIPE:
             raise serializers.ValidationError(
@@ -135,25 +230,81 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Ингредиенты должны быть уникальными!"
             )
+        self.validate_ingredients_exist(ingredients_ids)
 
         return data
 
+    def validate_ingredients_exist(self, ingredients_ids):
+        existing_ids = set(
+            Ingredient.objects.filter(id__in=ingredients_ids).values_list(
+                "id", flat=True
+            )
+        )
+        missing_ids = [id for id in ingredients_ids if id not in existing_ids]
+        if missing_ids:
+            raise serializers.ValidationError(
+                {
+                    "ingredients": [
+                        f"Ингредиента с id {id} не существует."
+                        for id in missing_ids
+                    ]
+                }
+            )
+
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop("ingredients")
 
         user = self.context.get("request").user
         recipe = Recipe.objects.create(**validated_data, author=user)
         self.create_ingredients(ingredients, recipe)
+        inverted_index.set_recipe(recipe.id, [el["id"] for el in ingredients])
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-
-        self.create_ingredients(validated_data.pop("ingredients"), instance)
+        ingredients = validated_data.pop("ingredients")
+        self.update_ingredients(
+            instance, {el["id"]: el["amount"] for el in ingredients}
+        )
 
         return super().update(instance, validated_data)
 
+    def update_ingredients(self, recipe, amounts):
+        """Write only the rows differing from {ingredient id: amount}."""
+        rows = {
+            row.ingredient_id: row
+            for row in IngredientInRecipe.objects.filter(recipe=recipe)
+        }
+        old_amounts = {
+            ingredient_id: row.amount for ingredient_id, row in rows.items()
+        }
+        if amounts == old_amounts:
+            return
+
+        changed_rows = []
+        for ingredient_id, row in rows.items():
+            amount = amounts.get(ingredient_id, row.amount)
+            if amount != row.amount:
+                row.amount = amount
+                changed_rows.append(row)
+        IngredientInRecipe.objects.bulk_update(changed_rows, ["amount"])
+        IngredientInRecipe.objects.filter(
+            recipe=recipe, ingredient_id__in=rows.keys() - amounts.keys()
+        ).delete()
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount
+            )
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in rows
+        )
+
+        if amounts.keys() != rows.keys():
+            inverted_index.set_recipe(recipe.id, amounts.keys())
+        cart_totals.update_recipe(recipe.id, old_amounts, amounts)
+
     def create_ingredients(self, ingredients, recipe):
         instances = []
         for element in ingredients:
@@ -169,11 +320,22 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         IngredientInRecipe.objects.bulk_create(instances)
 
 
+class ImportRecipeSerializer(CreateRecipeSerializer):
+    """Validates one NDJSON row of a bulk import, see recipes.importer."""
+
+    image = Bit64ImageField(required=False)
+
+    def validate_ingredients_exist(self, ingredients_ids):
+        # Checked for the whole batch at once by recipes.importer.
+        pass
+
+
 class ShortRecipeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_variants", "cooking_time")
 
 
 class UserRecipeRelationSerializer:
@@ -218,3 +380,23 @@ class ShoppingCartSerializer(
 
     def validate(self, data):
         return super().validate(data, "shopping_carts")
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=RELATION_BATCH_MAX_SIZE,
+    )
+
+
+class ShoppingCartTotalSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="ingredient.id")
+    name = serializers.CharField(source="ingredient.name")
+    measurement_unit = serializers.CharField(
+        source="ingredient.measurement_unit"
+    )
+
+    class Meta:
+        model = ShoppingCartTotal
+        fields = ("id", "name", "measurement_unit", "amount")
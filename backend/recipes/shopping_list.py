@@ -0,0 +1,159 @@
+"""Shopping list aggregation and downloadable formats."""
+import csv
+import io
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from PIL import Image, ImageDraw, ImageFont
+
+from api import versions
+from foodgram.constants import (SHOPPING_LIST_CACHE_TIMEOUT,
+                                SHOPPING_LIST_CHUNK_SIZE,
+                                SHOPPING_LIST_FILENAME,
+                                SHOPPING_LIST_PDF_FONT_SIZE,
+                                SHOPPING_LIST_PDF_LINE_HEIGHT,
+                                SHOPPING_LIST_PDF_MARGIN,
+                                SHOPPING_LIST_PDF_PAGE_SIZE,
+                                SHOPPING_LIST_PDF_RESOLUTION,
+                                SHOPPING_LIST_TITLE)
+from recipes.models import ShoppingCartTotal
+
+
+def get_totals(user):
+    """Return the user's materialized cart totals, ordered by name."""
+    return (
+        ShoppingCartTotal.objects.filter(user=user)
+        .select_related("ingredient")
+        .order_by("ingredient__name", "ingredient__measurement_unit")
+    )
+
+
+def get_ingredients(user):
+    """Yield (name, measurement unit, total amount) for the user's cart."""
+    return (
+        get_totals(user)
+        .values_list(
+            "ingredient__name", "ingredient__measurement_unit", "amount"
+        )
+        .iterator()
+    )
+
+
+def write_txt(rows):
+    for name, measurement_unit, total in rows:
+        yield f"{name}  - {total}({measurement_unit})\n"
+
+
+class Echo:
+    """File-like object handing csv.writer rows back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def write_csv(rows):
+    writer = csv.writer(Echo())
+    # BOM lets spreadsheet applications detect UTF-8.
+    yield "\ufeff" + writer.writerow(
+        ("Ингредиент", "Количество", "Единица измерения")
+    )
+    for name, measurement_unit, total in rows:
+        yield writer.writerow((name, total, measurement_unit))
+
+
+def get_pdf_font():
+    if os.path.exists(settings.SHOPPING_LIST_PDF_FONT):
+        return ImageFont.truetype(
+            settings.SHOPPING_LIST_PDF_FONT, SHOPPING_LIST_PDF_FONT_SIZE
+        )
+    return ImageFont.load_default(SHOPPING_LIST_PDF_FONT_SIZE)
+
+
+def write_pdf(rows):
+    """Render lines onto bilevel A4 pages, which keeps the file small."""
+    font = get_pdf_font()
+    width, height = SHOPPING_LIST_PDF_PAGE_SIZE
+    lines = [SHOPPING_LIST_TITLE, ""] + [
+        f"• {name} — {total} {measurement_unit}"
+        for name, measurement_unit, total in rows
+    ]
+
+    bottom = height - SHOPPING_LIST_PDF_MARGIN
+    pages = []
+    top = bottom
+    for line in lines:
+        if top + SHOPPING_LIST_PDF_LINE_HEIGHT > bottom:
+            pages.append(Image.new("1", (width, height), 1))
+            draw = ImageDraw.Draw(pages[-1])
+            top = SHOPPING_LIST_PDF_MARGIN
+        draw.text((SHOPPING_LIST_PDF_MARGIN, top), line, font=font, fill=0)
+        top += SHOPPING_LIST_PDF_LINE_HEIGHT
+
+    buffer = io.BytesIO()
+    pages[0].save(
+        buffer,
+        format="PDF",
+        save_all=True,
+        append_images=pages[1:],
+        resolution=SHOPPING_LIST_PDF_RESOLUTION,
+    )
+    content = buffer.getvalue()
+    for start in range(0, len(content), SHOPPING_LIST_CHUNK_SIZE):
+        yield content[start:start + SHOPPING_LIST_CHUNK_SIZE]
+
+
+WRITERS = {
+    "txt": write_txt,
+    "csv": write_csv,
+    "pdf": write_pdf,
+}
+
+
+def encode(chunks):
+    for chunk in chunks:
+        yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+def cache_when_complete(key, chunks):
+    """Pass chunks through, caching the whole body once fully produced."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+
+    cache.set(key, b"".join(parts), SHOPPING_LIST_CACHE_TIMEOUT)
+
+
+def get_cache_key(user, format):
+    cart_versions = versions.get_versions(
+        versions.get_cart_name(user.id), versions.INGREDIENTS
+    )
+    return f"shopping-list:{user.id}:{format}:" + ":".join(
+        map(str, cart_versions)
+    )
+
+
+def get_response(user, renderer):
+    """Stream the user's shopping list, reusing an unchanged render."""
+    format = renderer.format
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type += f"; charset={renderer.charset}"
+
+    key = get_cache_key(user, format)
+    content = cache.get(key)
+    if content is not None:
+        chunks = [content]
+    else:
+        chunks = cache_when_complete(
+            key, encode(WRITERS[format](get_ingredients(user)))
+        )
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{SHOPPING_LIST_FILENAME}.{format}"'
+    )
+
+    return response
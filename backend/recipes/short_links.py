@@ -0,0 +1,53 @@
+"""Short links of recipes.
+
+Codes are random base62 strings, so they tell nothing about the number
+of recipes, and always have a letter, so they never clash with legacy
+``/s/<id>`` links. A code never changes its recipe, so resolved codes
+are kept in a per process cache; a deleted recipe merely keeps
+redirecting to its not found page until evicted.
+"""
+import secrets
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+
+from foodgram.constants import (SHORT_LINK_ALPHABET, SHORT_LINK_CACHE_SIZE,
+                                SHORT_LINK_CODE_ATTEMPTS,
+                                SHORT_LINK_CODE_LENGTH)
+from recipes.models import ShortLink
+
+
+def generate_code():
+    while True:
+        code = "".join(
+            secrets.choice(SHORT_LINK_ALPHABET)
+            for _ in range(SHORT_LINK_CODE_LENGTH)
+        )
+        if not code.isdigit():
+            return code
+
+
+def get_code(recipe):
+    """Return the code of the recipe, creating it on the first call."""
+    for _ in range(SHORT_LINK_CODE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                link, _ = ShortLink.objects.get_or_create(
+                    recipe=recipe, defaults={"code": generate_code()}
+                )
+        except IntegrityError:
+            continue  # The code is taken by another recipe.
+        return link.code
+
+    raise IntegrityError(f"No free short link code for recipe {recipe.pk}.")
+
+
+@lru_cache(maxsize=SHORT_LINK_CACHE_SIZE)
+def resolve(code):
+    """Return the recipe id of the code, raising ShortLink.DoesNotExist.
+
+    Unknown codes raise, so they are not cached and can be created later.
+    """
+    return ShortLink.objects.values_list("recipe_id", flat=True).get(
+        code=code
+    )
@@ -0,0 +1,157 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from api import versions
+from foodgram import images
+from recipes import cache as recipe_cache
+from recipes import cart_totals, counters, feed, inverted_index
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingCart)
+from recipes.search import get_backend
+from users.models import Subscription, User
+
+AUTHOR_REPRESENTATION_FIELDS = {
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "avatar",
+}
+
+
+def invalidate_on_commit(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if recipe_ids:
+        transaction.on_commit(lambda: recipe_cache.invalidate(recipe_ids))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    versions.bump(versions.RECIPES)
+    invalidate_on_commit((instance.id,))
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_image_variants(sender, instance, raw, **kwargs):
+    if not raw:
+        images.refresh_later(instance, "image")
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out_later(instance.author_id, [instance.id])
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_index(sender, instance, **kwargs):
+    inverted_index.remove_recipe(instance.id)
+
+
+@receiver((post_save, post_delete), sender=IngredientInRecipe)
+def invalidate_recipe_ingredients(sender, instance, **kwargs):
+    versions.bump(versions.RECIPES)
+    invalidate_on_commit((instance.recipe_id,))
+    if kwargs.get("raw"):
+        # Fixture loading bypasses the incremental index updates.
+        inverted_index.invalidate()
+        transaction.on_commit(
+            lambda: cart_totals.refresh_recipe_carts(instance.recipe_id)
+        )
+
+
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(sender, instance, **kwargs):
+    versions.bump(versions.INGREDIENTS)
+    inverted_index.invalidate()
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_recipes(sender, instance, created, **kwargs):
+    versions.bump(versions.INGREDIENTS)
+    if not created:
+        invalidate_on_commit(
+            instance.ingredients_in_recipe.values_list("recipe_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_recipes(sender, instance, created, update_fields,
+                              **kwargs):
+    if created or (
+        update_fields is not None
+        and not AUTHOR_REPRESENTATION_FIELDS.intersection(update_fields)
+    ):
+        return
+
+    invalidate_on_commit(instance.recipes.values_list("id", flat=True))
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+def invalidate_favorites(sender, instance, **kwargs):
+    versions.bump(
+        versions.get_viewer_name(instance.user_id), versions.FAVORITES
+    )
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def invalidate_shopping_cart(sender, instance, **kwargs):
+    versions.bump(versions.get_viewer_name(instance.user_id))
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_cart_totals(sender, instance, created, raw, **kwargs):
+    if raw:
+        # Recipe ingredients may be loaded later in the same fixture.
+        transaction.on_commit(
+            lambda: cart_totals.refresh_users((instance.user_id,))
+        )
+    elif created:
+        cart_totals.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_cart_totals(sender, instance, **kwargs):
+    # Runs before cascades, while the recipe ingredients still exist.
+    cart_totals.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_feed(sender, instance, created, **kwargs):
+    if created:
+        feed.backfill(instance.subscriber_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def remove_author_from_feed(sender, instance, **kwargs):
+    feed.remove_author(instance.subscriber_id, instance.author_id)
+
+
+def increment_counter(sender, instance, created, raw, **kwargs):
+    for field, (_, related_model, related_field) in counters.COUNTERS.items():
+        if related_model is sender:
+            pk = getattr(instance, f"{related_field}_id")
+            if raw:
+                counters.reconcile_on_commit(field, pk)
+            elif created:
+                counters.add(field, pk, 1)
+
+
+def decrement_counter(sender, instance, **kwargs):
+    for field, (_, related_model, related_field) in counters.COUNTERS.items():
+        if related_model is sender:
+            counters.add(field, getattr(instance, f"{related_field}_id"), -1)
+
+
+for _, related_model, _ in counters.COUNTERS.values():
+    post_save.connect(increment_counter, sender=related_model)
+    post_delete.connect(decrement_counter, sender=related_model)
+
+
+def install_search_index(using, **kwargs):
+    """Restore search triggers dropped when migrations rebuild tables."""
+    connection = connections[using]
+    if Recipe._meta.db_table in connection.introspection.table_names():
+        with connection.schema_editor() as schema_editor:
+            get_backend(connection.vendor).install(schema_editor)
@@ -1,19 +1,33 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import Http404, HttpResponsePermanentRedirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import (AllowAny, IsAuthenticated,
+from rest_framework.permissions import (AllowAny, IsAdminUser, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 
-from api.pagination import MainPagePagination
+from api import versions
+from api.conditional import VIEWER, conditional_get
+from api.pagination import FeedCursorPagination, MainPagePagination
+from api.parsers import NDJSONParser
 from api.permissions import IsAuthorOrReadOnly
+from api.renderers import (CSVRenderer, FormatNegotiation, PDFRenderer,
+                           PlainTextRenderer)
+from foodgram.constants import SHORT_LINK_MAX_AGE, SHORT_LINK_REDIRECT_URL
+from recipes import autocomplete
+from recipes import cache as recipe_cache
+from recipes import feed as recipe_feed
+from recipes import importer, relations, shopping_list, short_links
 from recipes.filters import IngredientFilter, RecipeFilter
-from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
-                            ShoppingCart)
+from recipes.models import (Favorite, Ingredient, Recipe, ShoppingCart,
+                            ShortLink)
 from recipes.serializers import (CreateRecipeSerializer, FavoriteSerializer,
-                                 RecipeSerializer, ShoppingCartSerializer,
+                                 RecipeIdsSerializer, RecipeSerializer,
+                                 ShoppingCartSerializer,
+                                 ShoppingCartTotalSerializer,
                                  ShortIngredientsSerializer)
 
 
@@ -25,6 +39,22 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = IngredientFilter
     search_fields = ("^name",)
 
+    @conditional_get(versions.INGREDIENTS)
+    def list(self, request, *args, **kwargs):
+        return Response(
+            autocomplete.search(request.query_params.get("name", ""))
+        )
+
+    @conditional_get(versions.INGREDIENTS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+def get_recipe_updated(view, request, pk):
+    return (
+        Recipe.objects.filter(pk=pk).values_list("updated", flat=True).first()
+    )
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
@@ -33,6 +63,29 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        return Recipe.objects.with_related().with_user_flags(self.request.user)
+
+    @conditional_get(
+        versions.RECIPES,
+        versions.INGREDIENTS,
+        versions.USERS,
+        versions.FAVORITES,
+        VIEWER,
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(
+        versions.INGREDIENTS,
+        versions.USERS,
+        versions.FAVORITES,
+        VIEWER,
+        timestamp=get_recipe_updated,
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return RecipeSerializer
@@ -86,6 +139,44 @@ class RecipeViewSet(viewsets.ModelViewSet):
             "Рецепт не в списке покупок (корзине).",
         )
 
+    @action(
+        detail=False,
+        methods=("post", "delete"),
+        permission_classes=(IsAuthenticated,),
+        url_path="favorite_batch",
+        url_name="favorite_batch",
+    )
+    def favorite_batch(self, request):
+        return self.change_user_recipe_relations(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=("post", "delete"),
+        permission_classes=(IsAuthenticated,),
+        url_path="shopping_cart_batch",
+        url_name="shopping_cart_batch",
+    )
+    def shopping_cart_batch(self, request):
+        return self.change_user_recipe_relations(request, ShoppingCart)
+
+    def change_user_recipe_relations(self, request, model):
+        """Add (POST) or remove (DELETE) {"recipes": [<id>, ...]}."""
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if request.method == "POST":
+            change = relations.add
+        else:
+            change = relations.remove
+
+        return Response(
+            {
+                "results": change(
+                    model, request.user, serializer.validated_data["recipes"]
+                )
+            }
+        )
+
+    @transaction.atomic
     def create_user_recipe_relation(self, request, pk, serializer_class):
         serializer = serializer_class(
             data={
@@ -99,6 +190,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
     def delete_user_recipe_relation(
         self,
         request,
@@ -108,46 +200,88 @@ class RecipeViewSet(viewsets.ModelViewSet):
         does_not_exist_message,
     ):
         try:
-            getattr(request.user, related_name_for_user).get(
-                user=request.user, recipe_id=pk
-            ).delete()
+            # Locking keeps concurrent requests from both deleting the
+            # relation and decrementing counters twice.
+            relation = (
+                getattr(request.user, related_name_for_user)
+                .select_for_update()
+                .get(user=request.user, recipe_id=pk)
+            )
         except does_not_exist_exception:
             return Response(
                 does_not_exist_message,
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        relation.delete()
+
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=False,
         methods=("get",),
         permission_classes=(IsAuthenticated,),
+        renderer_classes=(PlainTextRenderer, CSVRenderer, PDFRenderer),
+        content_negotiation_class=FormatNegotiation,
         url_path="download_shopping_cart",
         url_name="download_shopping_cart",
     )
     def download_shopping_cart(self, request):
-        ingredients = (
-            IngredientInRecipe.objects.filter(
-                recipe__shopping_recipe__user=request.user
-            )
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(sum=Sum("amount"))
+        return shopping_list.get_response(
+            request.user, request.accepted_renderer
         )
-        shopping_list = self.ingredients_to_txt(ingredients)
-
-        return HttpResponse(shopping_list, content_type="text/plain")
-
-    @staticmethod
-    def ingredients_to_txt(ingredients):
-        shopping_list = ""
-        for ingredient in ingredients:
-            shopping_list += (
-                f"{ingredient['ingredient__name']}  - "
-                f"{ingredient['sum']}"
-                f"({ingredient['ingredient__measurement_unit']})\n"
-            )
-        return shopping_list
+
+    @action(
+        detail=False,
+        methods=("post",),
+        permission_classes=(IsAuthenticated,),
+        parser_classes=(NDJSONParser,),
+        url_path="import",
+        url_name="import",
+    )
+    def import_recipes(self, request):
+        """Create recipes from NDJSON lines, reporting errors per line."""
+        lines = request.data if not isinstance(request.data, dict) else ()
+        return Response(importer.import_lines(lines, request.user))
+
+    @action(
+        detail=False,
+        methods=("get",),
+        permission_classes=(IsAuthenticated,),
+        url_path="feed",
+        url_name="feed",
+    )
+    def feed(self, request):
+        paginator = FeedCursorPagination()
+        rows = paginator.paginate_queryset(
+            recipe_feed.get_feed(request.user), request, self
+        )
+        recipes = self.get_queryset().in_bulk(
+            [row["recipe_id"] for row in rows]
+        )
+        serializer = RecipeSerializer(
+            [
+                recipes[row["recipe_id"]]
+                for row in rows
+                if row["recipe_id"] in recipes
+            ],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=("get",),
+        permission_classes=(IsAuthenticated,),
+        url_path="shopping_cart_summary",
+        url_name="shopping_cart_summary",
+    )
+    def shopping_cart_summary(self, request):
+        serializer = ShoppingCartTotalSerializer(
+            shopping_list.get_totals(request.user), many=True
+        )
+        return Response(serializer.data)
 
     @action(
         detail=True,
@@ -159,6 +293,39 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def get_link(self, request, pk):
         instance = self.get_object()
 
-        url = f"{request.get_host()}/s/{instance.id}"
+        url = f"{request.get_host()}/s/{short_links.get_code(instance)}"
 
         return Response(data={"short-link": url})
+
+    @action(
+        detail=False,
+        methods=("get",),
+        permission_classes=(IsAdminUser,),
+        url_path="cache_stats",
+        url_name="cache_stats",
+    )
+    def cache_stats(self, request):
+        return Response(recipe_cache.get_stats())
+
+
+def redirect_to_recipe(recipe_id):
+    response = HttpResponsePermanentRedirect(
+        SHORT_LINK_REDIRECT_URL.format(recipe_id=recipe_id)
+    )
+    patch_cache_control(response, public=True, max_age=SHORT_LINK_MAX_AGE)
+    return response
+
+
+@require_safe
+def short_link(request, code):
+    """Redirect a short link to the recipe page, bypassing DRF."""
+    try:
+        return redirect_to_recipe(short_links.resolve(code))
+    except ShortLink.DoesNotExist:
+        raise Http404
+
+
+@require_safe
+def legacy_short_link(request, pk):
+    """Redirect links shared before short codes, given by recipe id."""
+    return redirect_to_recipe(pk)
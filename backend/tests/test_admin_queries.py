@@ -0,0 +1,136 @@
+"""Query budgets of every registered admin.
+
+Each model gets several rows, so a query per changelist row would break
+the budget. Budgets include the session and user lookups of the logged
+in superuser. A newly registered model needs rows in setUpTestData and
+budgets in CHANGELIST_QUERIES and CHANGE_VIEW_QUERIES.
+"""
+from django.contrib import admin
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from blobs.models import Blob
+from jobs.models import Job
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingCart, ShortLink)
+from users.models import Subscription, User
+
+ROWS = 3
+
+# Session, user, count, rows; the token and group changelists also
+# count the full result.
+CHANGELIST_QUERIES = {
+    "auth.Group": 5,
+    "authtoken.TokenProxy": 5,
+    "blobs.Blob": 4,
+    "jobs.Job": 4,
+    "recipes.Favorite": 4,
+    "recipes.Ingredient": 4,
+    "recipes.IngredientInRecipe": 4,
+    "recipes.Recipe": 4,
+    "recipes.ShoppingCart": 4,
+    "recipes.ShortLink": 4,
+    "users.Subscription": 4,
+    "users.User": 4,
+}
+
+CHANGE_VIEW_QUERIES = {
+    "auth.Group": 8,
+    "authtoken.TokenProxy": 8,
+    "blobs.Blob": 6,
+    "jobs.Job": 6,
+    "recipes.Favorite": 10,
+    "recipes.Ingredient": 6,
+    "recipes.IngredientInRecipe": 10,
+    # The autocomplete widget of every ingredient row loads its option.
+    "recipes.Recipe": 8 + ROWS,
+    "recipes.ShoppingCart": 10,
+    "recipes.ShortLink": 7,
+    "users.Subscription": 10,
+    "users.User": 10,
+}
+
+
+class AdminQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(
+            email="admin@example.com",
+            username="admin",
+            first_name="Админ",
+            last_name="Админов",
+            password="password",
+        )
+        users = [
+            User.objects.create_user(
+                email=f"user{number}@example.com",
+                username=f"user{number}",
+                first_name="Пользователь",
+                last_name=f"Пользователев {number}",
+                password="password",
+            )
+            for number in range(ROWS)
+        ]
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(ROWS)
+        )
+        for number, user in enumerate(users):
+            Token.objects.create(user=user)
+            Group.objects.create(name=f"Группа {number}")
+            Blob.objects.create(name=f"recipes/images/{number}.png")
+            Job.objects.create(
+                function="foodgram.images.process", kwargs={"pk": number}
+            )
+            for author in users:
+                if author != user:
+                    Subscription.objects.create(subscriber=user, author=author)
+            recipe = Recipe.objects.create(
+                author=user,
+                name=f"Рецепт {number}",
+                text="Описание",
+                cooking_time=10,
+            )
+            ShortLink.objects.create(recipe=recipe, code=f"code{number}")
+            for amount, ingredient in enumerate(ingredients, start=1):
+                IngredientInRecipe.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+            for other_user in users:
+                Favorite.objects.create(user=other_user, recipe=recipe)
+                ShoppingCart.objects.create(user=other_user, recipe=recipe)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def get_url(self, model, view, *args):
+        return reverse(
+            f"admin:{model._meta.app_label}_{model._meta.model_name}_{view}",
+            args=args,
+        )
+
+    def test_changelists(self):
+        for model in admin.site._registry:
+            label = model._meta.label
+            with self.subTest(model=label):
+                self.assertGreaterEqual(model.objects.count(), ROWS)
+                with self.assertNumQueries(CHANGELIST_QUERIES[label]):
+                    response = self.client.get(
+                        self.get_url(model, "changelist")
+                    )
+                self.assertEqual(response.status_code, 200)
+
+    def test_change_views(self):
+        for model in admin.site._registry:
+            label = model._meta.label
+            with self.subTest(model=label):
+                # Not values_list: TokenProxy is addressed by its user.
+                pk = model.objects.first().pk
+                with self.assertNumQueries(CHANGE_VIEW_QUERIES[label]):
+                    response = self.client.get(
+                        self.get_url(model, "change", pk)
+                    )
+                self.assertEqual(response.status_code, 200)
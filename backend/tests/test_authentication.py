@@ -0,0 +1,61 @@
+"""Cached token lookups never outlive a revocation."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from api import versions
+from api.authentication import CachedTokenAuthentication
+from users.models import User
+
+
+class CachedTokenAuthenticationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com",
+            username="user",
+            first_name="Пользователь",
+            last_name="Пользователев",
+            password="password",
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        CachedTokenAuthentication.entries.clear()
+        self.authentication = CachedTokenAuthentication()
+
+    def test_revoked_during_lookup(self):
+        authenticate = TokenAuthentication.authenticate_credentials
+
+        def authenticate_then_revoke(authentication, key):
+            try:
+                return authenticate(authentication, key)
+            finally:
+                # Deactivation commits after the row was read.
+                User.objects.filter(pk=self.user.pk).update(is_active=False)
+                versions.touch(versions.get_auth_name(self.user.pk))
+
+        with mock.patch.object(
+            TokenAuthentication,
+            "authenticate_credentials",
+            authenticate_then_revoke,
+        ):
+            self.authentication.authenticate_credentials(self.token.key)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_cached(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, _ = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertNotIn("password", user.__dict__)
@@ -0,0 +1,40 @@
+"""Conditional GET of the ingredient list."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import versions
+
+URL = "/api/ingredients/"
+CHANGED = "Thu, 01 Jan 1970 00:00:10 GMT"
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def change(self, seconds):
+        with mock.patch("time.time_ns", return_value=int(seconds * 10 ** 9)):
+            versions.touch(versions.INGREDIENTS)
+
+    def get(self, seconds, **headers):
+        with mock.patch("time.time", return_value=seconds):
+            return self.client.get(URL, headers=headers)
+
+    def test_change_in_the_same_second(self):
+        self.change(10.3)
+        self.assertNotIn("Last-Modified", self.get(10.5).headers)
+        self.change(10.8)
+        response = self.get(10.9, if_modified_since=CHANGED)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified(self):
+        self.change(10.3)
+        response = self.get(11)
+        self.assertEqual(response.headers["Last-Modified"], CHANGED)
+        response = self.get(12, if_modified_since=CHANGED)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,51 @@
+"""Counters survive saves of instances loaded before they moved."""
+from django.test import TestCase
+
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+
+class StaleSaveTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Авторов",
+            password="password",
+        )
+        cls.reader = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Читатель",
+            last_name="Читателев",
+            password="password",
+        )
+
+    def create_recipe(self):
+        return Recipe.objects.create(
+            author=self.author, name="Рецепт", text="Описание", cooking_time=5
+        )
+
+    def test_recipe_save_keeps_favorites_count(self):
+        recipe = self.create_recipe()
+        stale = Recipe.objects.get(pk=recipe.pk)
+        Favorite.objects.create(user=self.reader, recipe=recipe)
+        stale.name = "Новое название"
+        stale.save()
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.name, "Новое название")
+
+    def test_user_save_keeps_recipes_count(self):
+        stale = User.objects.get(pk=self.author.pk)
+        self.create_recipe()
+        stale.first_name = "Автор2"
+        stale.save()
+
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 1)
+        self.assertEqual(self.author.first_name, "Автор2")
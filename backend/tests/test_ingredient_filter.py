@@ -0,0 +1,79 @@
+"""Recipes filtered by ingredients are ranked by the index."""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.inverted_index import RecipeIngredientIndex
+from recipes.models import Ingredient, IngredientInRecipe, Recipe
+from users.models import User
+
+
+class IngredientFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Авторов",
+            password="password",
+        )
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(4)
+        )
+        # Share of the first ingredient: 1/4, 1/3, 1/2, 1, none.
+        cls.recipes = {}
+        for count in (4, 3, 2, 1, 0):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {count}",
+                text="Описание",
+                cooking_time=5,
+            )
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in (
+                    cls.ingredients[:count] or cls.ingredients[1:]
+                )
+            )
+            cls.recipes[count] = recipe.id
+
+    def setUp(self):
+        cache.clear()
+        RecipeIngredientIndex.current_version = None
+        self.client = APIClient()
+
+    def get_ids(self, **params):
+        response = self.client.get("/api/recipes/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["count"], [
+            recipe["id"] for recipe in response.data["results"]
+        ]
+
+    def test_ranked_by_coverage(self):
+        first = self.ingredients[0].id
+        count, ids = self.get_ids(ingredients=first, match="any", limit=10)
+        self.assertEqual(count, 4)
+        self.assertEqual(ids, [self.recipes[count] for count in (1, 2, 3, 4)])
+
+    def test_pages(self):
+        first = self.ingredients[0].id
+        count, ids = self.get_ids(
+            ingredients=first, match="any", limit=3, page=2
+        )
+        self.assertEqual(count, 4)
+        self.assertEqual(ids, [self.recipes[4]])
+
+    def test_match_all(self):
+        first, second = self.ingredients[0].id, self.ingredients[1].id
+        # Index build, matching ids, the page, its ingredients.
+        with self.assertNumQueries(4):
+            count, ids = self.get_ids(
+                ingredients=f"{first},{second}", match="all", limit=10
+            )
+        self.assertEqual(count, 3)
+        self.assertEqual(ids, [self.recipes[count] for count in (2, 3, 4)])
@@ -0,0 +1,158 @@
+"""Query budgets of the recipe and subscription endpoints.
+
+Every page holds several recipes of several authors with several
+ingredients, so a query per row would break the budget. The cache is
+cleared before each test, the counts are those of a cold request.
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes import cache as recipe_cache
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingCart)
+from users.models import Subscription, User
+
+AUTHORS = 3
+RECIPES_PER_AUTHOR = 3
+INGREDIENTS_PER_RECIPE = 3
+RECIPES = AUTHORS * RECIPES_PER_AUTHOR
+
+
+class RecipeQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(
+            email="viewer@example.com",
+            username="viewer",
+            first_name="Зритель",
+            last_name="Зрителев",
+            password="password",
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(INGREDIENTS_PER_RECIPE)
+        )
+        for author_number in range(AUTHORS):
+            author = User.objects.create_user(
+                email=f"author{author_number}@example.com",
+                username=f"author{author_number}",
+                first_name="Автор",
+                last_name=f"Авторов {author_number}",
+                password="password",
+            )
+            Subscription.objects.create(subscriber=cls.viewer, author=author)
+            for recipe_number in range(RECIPES_PER_AUTHOR):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f"Рецепт {author_number}.{recipe_number}",
+                    text="Описание",
+                    cooking_time=10,
+                )
+                for amount, ingredient in enumerate(ingredients, start=1):
+                    IngredientInRecipe.objects.create(
+                        recipe=recipe, ingredient=ingredient, amount=amount
+                    )
+                Favorite.objects.create(user=cls.viewer, recipe=recipe)
+                ShoppingCart.objects.create(user=cls.viewer, recipe=recipe)
+        cls.recipe = Recipe.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        self.anonymous_client = APIClient()
+        self.authorized_client = APIClient()
+        self.authorized_client.force_authenticate(self.viewer)
+
+    def check_page(self, response, count):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), count)
+
+    def test_list_anonymous(self):
+        # Count, recipes with authors, ingredients.
+        with self.assertNumQueries(3):
+            response = self.anonymous_client.get(
+                "/api/recipes/", {"limit": RECIPES}
+            )
+        self.check_page(response, RECIPES)
+
+    def test_list_authorized(self):
+        # Also the viewer's subscriptions, flags are annotations.
+        with self.assertNumQueries(4):
+            response = self.authorized_client.get(
+                "/api/recipes/", {"limit": RECIPES}
+            )
+        self.check_page(response, RECIPES)
+        self.assertTrue(
+            all(
+                recipe["is_favorited"] and recipe["is_in_shopping_cart"]
+                for recipe in response.data["results"]
+            )
+        )
+
+    def test_list_cached(self):
+        # Fill the entries, then create the hit counter.
+        for _ in range(2):
+            self.anonymous_client.get("/api/recipes/", {"limit": RECIPES})
+        with mock.patch.object(recipe_cache, "cache", wraps=cache) as calls:
+            response = self.anonymous_client.get(
+                "/api/recipes/", {"limit": RECIPES}
+            )
+        self.check_page(response, RECIPES)
+        # The whole page and its hits, not a read and a count per recipe.
+        self.assertEqual(
+            [name for name, *_ in calls.method_calls], ["get_many", "incr"]
+        )
+        self.assertEqual(recipe_cache.get_stats()["hits"], 2 * RECIPES)
+
+    def test_list_favorited(self):
+        with self.assertNumQueries(4):
+            response = self.authorized_client.get(
+                "/api/recipes/", {"is_favorited": 1, "limit": RECIPES}
+            )
+        self.check_page(response, RECIPES)
+
+    def test_detail_anonymous(self):
+        # Timestamp for the ETag, recipe, ingredients.
+        with self.assertNumQueries(3):
+            response = self.anonymous_client.get(
+                f"/api/recipes/{self.recipe.id}/"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.data["ingredients"]), INGREDIENTS_PER_RECIPE
+        )
+
+    def test_detail_authorized(self):
+        with self.assertNumQueries(4):
+            response = self.authorized_client.get(
+                f"/api/recipes/{self.recipe.id}/"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_favorited"])
+        self.assertTrue(response.data["author"]["is_subscribed"])
+
+    def test_subscriptions(self):
+        # Count, authors, viewer's subscriptions, recipes of the page.
+        with self.assertNumQueries(4):
+            response = self.authorized_client.get(
+                "/api/users/subscriptions/"
+            )
+        self.check_page(response, AUTHORS)
+        self.assertTrue(
+            all(
+                len(author["recipes"]) == RECIPES_PER_AUTHOR
+                for author in response.data["results"]
+            )
+        )
+
+    def test_favorite(self):
+        Favorite.objects.filter(user=self.viewer, recipe=self.recipe).delete()
+        # Savepoint, user, recipe, two duplicate checks, insert, counter.
+        with self.assertNumQueries(8):
+            response = self.authorized_client.post(
+                f"/api/recipes/{self.recipe.id}/favorite/"
+            )
+        self.assertEqual(response.status_code, 201)
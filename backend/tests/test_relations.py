@@ -0,0 +1,100 @@
+"""Batch changes of favorites and carts.
+
+Adding or removing any number of recipes takes the same queries, and
+leaves the counters and cart totals the signals would.
+"""
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes import cart_totals
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingCart)
+from users.models import User
+
+RECIPES = 20
+
+
+class RelationBatchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com",
+            username="user",
+            first_name="Пользователь",
+            last_name="Пользователев",
+            password="password",
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(3)
+        )
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.user,
+                name=f"Рецепт {number}",
+                text="Описание",
+                cooking_time=5,
+            )
+            for number in range(RECIPES)
+        )
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+            for recipe in recipes
+            for amount, ingredient in enumerate(ingredients, start=1)
+        )
+        cls.recipe_ids = [recipe.id for recipe in recipes]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def change(self, method, url, recipe_ids, queries):
+        with self.assertNumQueries(queries):
+            response = getattr(self.client, method)(
+                url, {"recipes": recipe_ids}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_shopping_cart(self):
+        url = "/api/recipes/shopping_cart_batch/"
+        self.change("post", url, self.recipe_ids, 11)
+        self.change("delete", url, self.recipe_ids[1:], 11)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.shopping_cart_count, 1)
+        self.assertEqual(
+            ShoppingCart.objects.filter(user=self.user).count(), 1
+        )
+        self.assertEqual(
+            sorted(
+                self.user.shopping_cart_totals.values_list(
+                    "ingredient_id", "amount"
+                )
+            ),
+            sorted(
+                (ingredient_id, amount)
+                for _, ingredient_id, amount in cart_totals.compute_totals(
+                    [self.user.id]
+                )
+            ),
+        )
+
+    def test_favorites(self):
+        url = "/api/recipes/favorite_batch/"
+        self.change("post", url, self.recipe_ids, 6)
+        self.change("delete", url, self.recipe_ids[1:], 6)
+
+        self.assertEqual(
+            Favorite.objects.filter(user=self.user).count(), 1
+        )
+        self.assertEqual(
+            list(
+                Recipe.objects.filter(favorites_count=1).values_list(
+                    "id", flat=True
+                )
+            ),
+            self.recipe_ids[:1],
+        )
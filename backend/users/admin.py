@@ -1,12 +1,13 @@
-from django.contrib import admin
 from django.contrib.admin import register
 from django.contrib.auth.admin import UserAdmin
 
+from foodgram.admin import LargeTableAdminMixin
+
 from .models import User
 
 
 @register(User)
-class MyUserAdmin(UserAdmin):
+class MyUserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = (
         "pk",
         "username",
@@ -17,14 +18,7 @@ class MyUserAdmin(UserAdmin):
         "avatar",
         "recipes_count",
         "subscribers_count",
+        "shopping_cart_count",
     )
-    list_filter = ("username", "email")
+    list_filter = ("is_staff", "is_active")
     search_fields = ("username", "email")
-
-    @admin.display(description="Количество рецептов")
-    def recipes_count(self, obj):
-        return obj.recipes.count()
-
-    @admin.display(description="Количество подписчиков")
-    def subscribers_count(self, obj):
-        return obj.subscriptions_where_author.count()
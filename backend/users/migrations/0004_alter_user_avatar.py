@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+import blobs.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_avatar_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="avatar",
+            field=models.ImageField(
+                blank=True,
+                storage=blobs.storage.get_storage,
+                upload_to="users/",
+                verbose_name="Аватар пользователя",
+            ),
+        ),
+    ]
@@ -1,17 +1,48 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
 
+from api import versions
+from blobs.storage import get_storage
 from foodgram.constants import (USER_AVATAR_UPLOAD_TO, USER_EMAIL_MAX_LENGTH,
                                 USER_FIRST_NAME_MAX_LENGTH,
                                 USER_LAST_NAME_MAX_LENGTH,
                                 USER_USERNAME_MAX_LENGTH, USER_USERNAME_REGEX)
+from foodgram.models import CounterFieldsMixin
 
 
-class User(AbstractUser):
+class UserQuerySet(models.QuerySet):
+    # Read by api.authentication from cached users, see AUTH_FIELDS.
+    AUTH_FIELDS = {"password", "is_active", "is_staff", "is_superuser"}
+
+    def update(self, **kwargs):
+        """Drop cached tokens of the users whose access changes."""
+        if not self.AUTH_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            # Moved once the update commits.
+            versions.bump(
+                *map(versions.get_auth_name, self.values_list("pk", flat=True))
+            )
+            return super().update(**kwargs)
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
+class User(CounterFieldsMixin, AbstractUser):
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
+    # Stale instances, e.g. cached by api.authentication, are saved too.
+    COUNTER_FIELDS = (
+        "recipes_count",
+        "subscribers_count",
+        "shopping_cart_count",
+    )
 
     email = models.EmailField(
         verbose_name="Электронная почта",
@@ -36,8 +67,31 @@ class User(AbstractUser):
     avatar = models.ImageField(
         verbose_name="Аватар пользователя",
         upload_to=USER_AVATAR_UPLOAD_TO,
+        storage=get_storage,
         blank=True,
     )
+    avatar_variants = models.JSONField(
+        verbose_name="Уменьшенные копии аватара",
+        default=dict,
+        editable=False,
+    )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name="Количество рецептов",
+        default=0,
+        editable=False,
+    )
+    subscribers_count = models.PositiveIntegerField(
+        verbose_name="Количество подписчиков",
+        default=0,
+        editable=False,
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        verbose_name="Рецептов в списке покупок",
+        default=0,
+        editable=False,
+    )
+
+    objects = UserManager()
 
     class Meta:
         verbose_name = "Пользователь"
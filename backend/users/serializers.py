@@ -1,47 +1,68 @@
 from rest_framework import serializers
 
 from api.serializers import UserProfileSerializer
+from recipes.models import Recipe
 from recipes.serializers import ShortRecipeSerializer
 from users.models import Subscription
 
 
 class SubscriptionSerializer(UserProfileSerializer):
     recipes = serializers.SerializerMethodField(method_name="get_recipes")
-    recipes_count = serializers.ReadOnlyField(source="recipes.count")
+    recipes_count = serializers.ReadOnlyField()
+    subscribers_count = serializers.ReadOnlyField()
 
     class Meta(UserProfileSerializer.Meta):
         fields = UserProfileSerializer.Meta.fields + (
             "recipes",
             "recipes_count",
+            "subscribers_count",
         )
 
     def get_recipes(self, obj):
         request = self.context.get("request")
-        recipes = obj.recipes.all()
-        recipes_limit = request.query_params.get("recipes_limit")
-
-        if recipes_limit:
-            try:
-                recipes = recipes[:int(recipes_limit)]
-            except ValueError:
-                pass
+        recipes = self.get_recipe_previews(request, obj).get(obj.id, [])
 
         return ShortRecipeSerializer(
             recipes, context={"request": request}, many=True
         ).data
 
+    def get_recipe_previews(self, request, obj):
+        """Load previews for every author being serialized in one query."""
+        if not hasattr(request, "_recipe_previews"):
+            authors = (
+                self.parent.instance
+                if isinstance(self.parent, serializers.ListSerializer)
+                else [obj]
+            )
+            limit = self.get_recipes_limit(request)
+            previews = {}
+            for recipe in Recipe.objects.latest_by_author(
+                [author.id for author in authors], limit
+            ):
+                author_recipes = previews.setdefault(recipe.author_id, [])
+                if limit is None or len(author_recipes) < limit:
+                    author_recipes.append(recipe)
+            request._recipe_previews = previews
+
+        return request._recipe_previews
+
+    @staticmethod
+    def get_recipes_limit(request):
+        try:
+            limit = int(request.query_params.get("recipes_limit"))
+        except (TypeError, ValueError):
+            return None
+
+        return max(limit, 0)
+
 
 class CreateSubscriptionSerializer(serializers.ModelSerializer):
-    recipes = serializers.ReadOnlyField(source="author.recipes.all")
-    recipes_count = serializers.ReadOnlyField(source="author.recipes.count")
 
     class Meta:
         model = Subscription
         fields = (
             "author",
             "subscriber",
-            "recipes",
-            "recipes_count",
         )
         extra_kwargs = {
             "author": {"write_only": True},
@@ -49,14 +70,14 @@ class CreateSubscriptionSerializer(serializers.ModelSerializer):
         }
 
     def to_representation(self, instance):
-        data = UserProfileSerializer(
+        # Pick up the counters moved by the subscription signals.
+        instance.author.refresh_from_db(
+            fields=("recipes_count", "subscribers_count")
+        )
+        return SubscriptionSerializer(
             instance.author, context={"request": self.context["request"]}
         ).data
 
-        data.update(super().to_representation(instance))
-
-        return data
-
     def validate(self, data):
         if data["subscriber"] == data["author"]:
             raise serializers.ValidationError(
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api import versions
+from foodgram import images
+from users.models import Subscription, User
+
+
+@receiver(post_save, sender=User)
+def invalidate_users(sender, instance, update_fields, **kwargs):
+    if update_fields is None or set(update_fields) - {"last_login"}:
+        versions.bump(versions.USERS)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_tokens(sender, instance, update_fields, **kwargs):
+    # Covers password changes and deactivation, see api.authentication.
+    if update_fields is None or set(update_fields) - {"last_login"}:
+        versions.bump(versions.get_auth_name(instance.pk))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    versions.bump(versions.get_auth_name(instance.user_id))
+
+
+@receiver(post_save, sender=User)
+def refresh_avatar_variants(sender, instance, raw, update_fields, **kwargs):
+    if not raw and (update_fields is None or "avatar" in update_fields):
+        images.refresh_later(instance, "avatar")
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    versions.bump(versions.USERS)
+
+
+@receiver((post_save, post_delete), sender=Subscription)
+def invalidate_subscriber(sender, instance, **kwargs):
+    versions.bump(versions.get_viewer_name(instance.subscriber_id))